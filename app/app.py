@@ -1,9 +1,31 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, stream_with_context, g
 from flask_cors import CORS
-from app.db import init_db, SessionLocal, User, History
-from app.utils import predict_diseases, recommend_for_diseases
-from app.auth import bp as auth_bp, TOKENS
+from app.db import init_db, db_session, History
+from sqlalchemy import and_, or_
+from app.utils import analyze_symptoms, analyze_batch, load_model, start_model_watcher, prediction_cache
+from app import utils, registry
+from app.auth import bp as auth_bp, verify_token
+from app.history_writer import history_writer
+from app.history_stats import user_stats, TOP_N
+from app.prediction_store import decode, histories_predicting
+from app.metrics import STAGE_SECONDS, REQUEST_SECONDS, REQUESTS, render as render_metrics
+import base64
+import datetime
+import hmac
 import json
+import os
+import time
+
+# Rows scored per predict_proba call when streaming a batch
+BATCH_CHUNK_SIZE = 512
+HISTORY_PAGE_SIZE = 100
+HISTORY_MAX_PAGE_SIZE = 1000
+# Streamed history rows decoded per round trip to the prediction tables
+HISTORY_STREAM_CHUNK = 500
+# Longest ?days= window accepted by /admin/predictions
+ADMIN_MAX_DAYS = 3650
+# Required in the X-Admin-Token header of /admin/* requests; admin routes are disabled when unset
+ADMIN_TOKEN = os.environ.get('CURESENSE_ADMIN_TOKEN')
 
 app = Flask(__name__)
 CORS(app) 
@@ -12,17 +34,45 @@ app.register_blueprint(auth_bp, url_prefix="/auth")
 # Initialize database
 init_db()
 
+@app.teardown_appcontext
+def remove_session(exc=None):
+    db_session.remove()
+
+@app.before_request
+def start_timer():
+    g.request_start = time.perf_counter()
+    start_model_watcher()
+
+@app.after_request
+def record_request(response):
+    endpoint = request.endpoint or 'unmatched'
+    if 'request_start' in g:
+        start = g.request_start
+        if response.is_streamed:
+            # Streamed bodies (/predict/batch, /history?stream=1) are produced after
+            # this hook returns; stop the clock once the last chunk has been sent.
+            response.call_on_close(lambda: REQUEST_SECONDS.observe(time.perf_counter() - start, endpoint))
+        else:
+            REQUEST_SECONDS.observe(time.perf_counter() - start, endpoint)
+    REQUESTS.inc(endpoint, str(response.status_code))
+    return response
+
 @app.route('/')
 def home():
     return jsonify({
         "message": "✅ CureSense Flask Backend is Live!",
         "status": "running",
-        "endpoints": ["/health", "/predict", "/history", "/auth"]
+        "endpoints": ["/health", "/metrics", "/predict", "/predict/batch", "/history", "/history/stats", "/auth"]
     })
 
 @app.route('/health', methods=['GET'])
 def health():
-    return jsonify({'status': 'ok'})
+    return jsonify({'status': 'ok', 'model_version': utils.state.version, 'cache': prediction_cache.stats()})
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """This worker's metrics only; see app/metrics.py for scraping under gunicorn."""
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
 
 @app.route('/predict', methods=['POST'])
 def predict():
@@ -33,55 +83,255 @@ def predict():
     if not symptoms:
         return jsonify({'error': 'No symptoms provided'}), 400
 
-    disease_confidences = predict_diseases(symptoms)
-    diseases_only = [d for d, _ in disease_confidences]
-    meds, docs = recommend_for_diseases(disease_confidences)
-
-    username = TOKENS.get(token)
-    db = SessionLocal()
-    if username:
-        user = db.query(User).filter_by(username=username).first()
-        if user:
-            hist = History(
-                user_id=user.id,
+    disease_confidences, meds, docs, model_version = analyze_symptoms(symptoms)
+
+    with STAGE_SECONDS.time("auth"):
+        claims = verify_token(token)
+    if claims:
+        with STAGE_SECONDS.time("history_enqueue"):
+            history_writer.submit(
+                user_id=claims['uid'],
                 symptoms=symptoms,
-                predicted_diseases=json.dumps(diseases_only),
-                medications=json.dumps(meds)
+                predictions=disease_confidences,
+                medications=meds,
+                doctor_types=json.dumps(docs),
+                model_version=model_version
             )
-            db.add(hist)
-            db.commit()
 
-    return jsonify({
-        'symptoms': symptoms,
-        'predicted_diseases': disease_confidences,
-        'medications': meds,
-        'doctor_types': docs
-    })
+    with STAGE_SECONDS.time("serialize"):
+        return jsonify({
+            'symptoms': symptoms,
+            'predicted_diseases': disease_confidences,
+            'medications': meds,
+            'doctor_types': docs,
+            'model_version': model_version
+        })
+
+def _ndjson_records():
+    """Yield (record, error) pairs from an NDJSON request body, one per non-empty line."""
+    for raw in request.stream:
+        line = raw.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line), None
+        except ValueError as e:
+            yield None, f'Invalid JSON line: {e}'
+
+
+def _batch_chunks(records, size):
+    chunk = []
+    for index, (item, error) in enumerate(records):
+        record_id = item.get('id', item.get('request_id')) if isinstance(item, dict) else None
+        symptoms = item.get('symptoms', '') if isinstance(item, dict) else item
+        if error is None and (not isinstance(symptoms, str) or not symptoms.strip()):
+            error = 'No symptoms provided'
+        chunk.append((index, record_id, symptoms, error))
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+@app.route('/predict/batch', methods=['POST'])
+def predict_batch():
+    top_k = min(max(request.args.get('top_k', 3, type=int), 1), len(utils.state.engine.classes))
+    if request.mimetype in ('application/x-ndjson', 'application/jsonl', 'text/plain'):
+        records = _ndjson_records()
+    else:
+        # A JSON body is parsed up front, so a malformed one is a 400 rather than a streamed error row
+        data = request.get_json(silent=True)
+        if isinstance(data, dict):
+            data = data.get('symptoms', data.get('records'))
+        if not isinstance(data, list):
+            return jsonify({'error': 'Expected a list of symptom strings or NDJSON records'}), 400
+        records = ((item, None) for item in data)
+
+    def generate():
+        for chunk in _batch_chunks(records, BATCH_CHUNK_SIZE):
+            valid = [row for row in chunk if row[3] is None]
+            results, model_version = analyze_batch([row[2] for row in valid], top_k) if valid else ([], None)
+            results = iter(results)
+            for index, record_id, symptoms, error in chunk:
+                out = {'index': index}
+                if record_id is not None:
+                    out['id'] = record_id
+                if error is not None:
+                    out['error'] = error
+                else:
+                    disease_confidences, meds, docs = next(results)
+                    out.update({
+                        'symptoms': symptoms,
+                        'predicted_diseases': disease_confidences,
+                        'medications': meds,
+                        'doctor_types': docs,
+                        'model_version': model_version
+                    })
+                yield json.dumps(out) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+def _encode_cursor(h):
+    raw = f"{h.created_at.isoformat()}|{h.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def _decode_cursor(cursor):
+    created_at, history_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+    return datetime.datetime.fromisoformat(created_at), int(history_id)
+
+def _history_entries(db, records):
+    decoded = decode(db, records)
+    return [{
+        'id': h.id,
+        'symptoms': h.symptoms,
+        'predicted_diseases': decoded[h.id]['predicted_diseases'],
+        'confidences': decoded[h.id]['confidences'],
+        'medications': decoded[h.id]['medications'],
+        'model_version': h.model_version,
+        'created_at': h.created_at.isoformat()
+    } for h in records]
 
 @app.route('/history', methods=['GET'])
 def history():
+    """
+    Newest-first history, one page at a time. Pass the returned next_cursor
+    back as ?cursor= for the following page, or ?stream=1 to receive every
+    remaining record as NDJSON.
+    """
     token = request.headers.get('Authorization')
-    username = TOKENS.get(token)
+    claims = verify_token(token)
+
+    if not claims:
+        return jsonify({'error': 'Unauthorized'}), 401
 
-    if not username:
+    username = claims['u']
+    db = db_session()
+    query = db.query(History).filter_by(user_id=claims['uid'])
+    cursor = request.args.get('cursor')
+    if cursor:
+        try:
+            created_at, history_id = _decode_cursor(cursor)
+        except (ValueError, UnicodeDecodeError):
+            return jsonify({'error': 'Invalid cursor'}), 400
+        query = query.filter(or_(
+            History.created_at < created_at,
+            and_(History.created_at == created_at, History.id < history_id)
+        ))
+    query = query.order_by(History.created_at.desc(), History.id.desc())
+
+    if request.args.get('stream', '').lower() in ('1', 'true', 'yes'):
+        def generate():
+            page = []
+            for h in query.yield_per(HISTORY_STREAM_CHUNK):
+                page.append(h)
+                if len(page) >= HISTORY_STREAM_CHUNK:
+                    yield ''.join(json.dumps(e) + '\n' for e in _history_entries(db, page))
+                    page = []
+            if page:
+                yield ''.join(json.dumps(e) + '\n' for e in _history_entries(db, page))
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+    limit = min(max(request.args.get('limit', HISTORY_PAGE_SIZE, type=int), 1), HISTORY_MAX_PAGE_SIZE)
+    with STAGE_SECONDS.time("history_query"):
+        records = query.limit(limit + 1).all()
+    next_cursor = _encode_cursor(records[limit - 1]) if len(records) > limit else None
+    history = _history_entries(db, records[:limit])
+    return jsonify({'user': username, 'history': history, 'next_cursor': next_cursor})
+
+@app.route('/history/stats', methods=['GET'])
+def history_stats():
+    """
+    Totals and top diseases, medications and doctors for the caller,
+    optionally limited to ?from=YYYY-MM-DD and/or ?to=YYYY-MM-DD (inclusive, UTC).
+    """
+    claims = verify_token(request.headers.get('Authorization'))
+    if not claims:
         return jsonify({'error': 'Unauthorized'}), 401
 
-    db = SessionLocal()
-    user = db.query(User).filter_by(username=username).first()
-    if not user:
-        return jsonify({'error': 'User not found'}), 404
-
-    records = db.query(History).filter_by(user_id=user.id).order_by(History.created_at.desc()).all()
-    history = [
-        {
-            'symptoms': h.symptoms,
-            'predicted_diseases': json.loads(h.predicted_diseases),
-            'medications': json.loads(h.medications),
-            'created_at': h.created_at.isoformat()
-        }
-        for h in records
-    ]
-    return jsonify({'user': username, 'history': history})
+    try:
+        start, end = (datetime.date.fromisoformat(request.args[k]) if request.args.get(k) else None
+                      for k in ('from', 'to'))
+    except ValueError:
+        return jsonify({'error': 'Dates must be YYYY-MM-DD'}), 400
+    top = min(max(request.args.get('top', TOP_N, type=int), 1), 100)
+    with STAGE_SECONDS.time("history_stats"):
+        stats = user_stats(db_session(), claims['uid'], start, end, top)
+    stats.update({'user': claims['u'], 'from': start and start.isoformat(), 'to': end and end.isoformat()})
+    return jsonify(stats)
+
+def _is_admin():
+    return bool(ADMIN_TOKEN) and hmac.compare_digest(request.headers.get('X-Admin-Token', ''), ADMIN_TOKEN)
+
+@app.route('/admin/reload', methods=['POST'])
+def admin_reload():
+    """
+    Hot-swap the served model. With {"version": ...} that registry version
+    becomes current (other workers follow via the registry watcher);
+    without it this worker reloads the current version.
+    """
+    if not _is_admin():
+        return jsonify({'error': 'Forbidden'}), 403
+
+    body = request.get_json(silent=True)
+    if body is None:
+        body = {}
+    if not isinstance(body, dict):
+        return jsonify({'error': 'Expected a JSON object'}), 400
+    version = body.get('version')
+    if version is not None and not isinstance(version, str):
+        return jsonify({'error': 'version must be a string'}), 400
+    # Only names already in the registry, so a request can never point load_model at another path
+    if version and version not in registry.list_versions():
+        return jsonify({'error': f'Unknown model version: {version}'}), 400
+    try:
+        # Load before publishing: a version that fails here never becomes CURRENT for other workers
+        state = load_model(version or None)
+        if version:
+            registry.set_current(version)
+    except (ValueError, KeyError, OSError) as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'model_version': state.version, 'available_versions': registry.list_versions()})
+
+@app.route('/admin/predictions', methods=['GET'])
+def admin_predictions():
+    """How many records predicted ?disease= in the last ?days= (default 7), with the newest ids."""
+    if not _is_admin():
+        return jsonify({'error': 'Forbidden'}), 403
+
+    disease = (request.args.get('disease') or '').strip()
+    if not disease:
+        return jsonify({'error': 'No disease provided'}), 400
+    try:
+        days = float(request.args.get('days', 7))
+    except ValueError:
+        days = None
+    if days is None or not 0 < days <= ADMIN_MAX_DAYS:
+        return jsonify({'error': f'days must be a number greater than 0 and at most {ADMIN_MAX_DAYS}'}), 400
+    since = datetime.datetime.utcnow() - datetime.timedelta(days=days)
+    query = histories_predicting(db_session(), disease, since)
+    recent = query.order_by(History.created_at.desc()).limit(HISTORY_PAGE_SIZE).all()
+    return jsonify({'disease': disease, 'since': since.isoformat(), 'count': query.count(),
+                    'recent_ids': [h.id for h in recent]})
+
+@app.route('/admin/history/<int:history_id>/confirm', methods=['POST'])
+def admin_confirm_history(history_id):
+    """Attach a clinician-confirmed diagnosis; training/incremental.py learns from these."""
+    if not _is_admin():
+        return jsonify({'error': 'Forbidden'}), 403
+
+    disease = ((request.get_json(silent=True) or {}).get('disease') or '').strip()
+    if not disease:
+        return jsonify({'error': 'No disease provided'}), 400
+
+    db = db_session()
+    record = db.get(History, history_id)
+    if not record:
+        return jsonify({'error': 'History record not found'}), 404
+    record.confirmed_disease = disease
+    record.confirmed_at = datetime.datetime.utcnow()
+    db.commit()
+    return jsonify({'id': record.id, 'confirmed_disease': record.confirmed_disease})
 
 if __name__ == "__main__":
     app.run(host='0.0.0.0', port=5000, debug=True)
@@ -1,10 +1,56 @@
 from flask import Blueprint, request, jsonify
 from werkzeug.security import generate_password_hash, check_password_hash
-from app.db import SessionLocal, User
+from app.db import db_session, User
+import base64
+import hashlib
+import hmac
+import json
+import os
 import secrets
+import time
 
 bp = Blueprint('auth', __name__)
-TOKENS = {}
+
+# Every worker must share the same key for tokens to verify across processes and restarts.
+SECRET_KEY = os.environ.get('CURESENSE_SECRET_KEY', '').encode()
+if not SECRET_KEY:
+    # Fine for local development; in production every restart would log everyone out
+    print("⚠️ CURESENSE_SECRET_KEY is not set; using a random key. Tokens stop verifying after a restart "
+          "and in any other worker process that did not inherit this key.")
+    SECRET_KEY = secrets.token_bytes(32)
+TOKEN_TTL = int(os.environ.get('CURESENSE_TOKEN_TTL', 7 * 24 * 3600))
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode()
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + '=' * (-len(data) % 4))
+
+def _sign(body: str) -> str:
+    return _b64encode(hmac.new(SECRET_KEY, body.encode(), hashlib.sha256).digest())
+
+def issue_token(user):
+    """HMAC-signed token carrying the username, user id and expiry."""
+    claims = {'u': user.username, 'uid': user.id, 'exp': int(time.time()) + TOKEN_TTL}
+    body = _b64encode(json.dumps(claims, separators=(',', ':')).encode())
+    return f"{body}.{_sign(body)}"
+
+def verify_token(token):
+    """Return the token's claims, or None if it is missing, forged or expired."""
+    if not token:
+        return None
+    if token.startswith('Bearer '):
+        token = token[len('Bearer '):]
+    body, _, signature = token.strip().partition('.')
+    if not signature or not hmac.compare_digest(signature, _sign(body)):
+        return None
+    try:
+        claims = json.loads(_b64decode(body))
+    except ValueError:
+        return None
+    if claims.get('exp', 0) < time.time():
+        return None
+    return claims
 
 @bp.route('/register', methods=['POST'])
 def register():
@@ -15,7 +61,7 @@ def register():
     if not username or not password:
         return jsonify({'error': 'Missing username or password'}), 400
 
-    db = SessionLocal()
+    db = db_session()
     if db.query(User).filter_by(username=username).first():
         return jsonify({'error': 'User already exists'}), 400
 
@@ -30,11 +76,9 @@ def login():
     username = data.get('username')
     password = data.get('password')
 
-    db = SessionLocal()
+    db = db_session()
     user = db.query(User).filter_by(username=username).first()
     if not user or not check_password_hash(user.password, password):
         return jsonify({'error': 'Invalid credentials'}), 401
 
-    token = secrets.token_hex(16)
-    TOKENS[token] = user.username
-    return jsonify({'token': token, 'username': user.username})
+    return jsonify({'token': issue_token(user), 'username': user.username, 'expires_in': TOKEN_TTL})
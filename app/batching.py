@@ -0,0 +1,62 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class MicroBatcher:
+    """
+    Collects concurrent single-row requests into one batch.
+
+    The first queued item opens a window of at most max_wait_us
+    microseconds; everything that arrives before it closes (up to
+    max_batch items) is passed to score_batch in one call, and each
+    caller gets back its own row of the result. Only useful when the
+    server handles requests on several threads (e.g. gunicorn gthread).
+    """
+
+    def __init__(self, score_batch, max_batch=32, max_wait_us=500):
+        self.score_batch = score_batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait_us / 1e6
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    def _ensure_started(self):
+        # Started lazily so each forked gunicorn worker gets its own thread.
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+                self._thread.start()
+
+    def submit(self, item):
+        """Score one item as part of the next batch and return its result."""
+        self._ensure_started()
+        future = Future()
+        self._queue.put((item, future))
+        return future.result()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.perf_counter() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                try:
+                    batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                results = self.score_batch([item for item, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
@@ -1,16 +1,62 @@
 import os
 import datetime
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, ForeignKey
-from sqlalchemy.orm import sessionmaker, declarative_base, relationship
+from sqlalchemy import create_engine, event, inspect, text, Column, Integer, SmallInteger, String, Text, Date, DateTime, ForeignKey, Index
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import sessionmaker, scoped_session, declarative_base, relationship
+from sqlalchemy.pool import StaticPool
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_DIR = os.path.join(BASE_DIR, "../data")
 os.makedirs(DATA_DIR, exist_ok=True)
-DATABASE_URL = f"sqlite:///{os.path.abspath(os.path.join(DATA_DIR, 'app.db'))}"
+DATABASE_URL = os.environ.get(
+    "DATABASE_URL", f"sqlite:///{os.path.abspath(os.path.join(DATA_DIR, 'app.db'))}"
+)
+IS_SQLITE = DATABASE_URL.startswith("sqlite")
+# sqlite:// and sqlite:///:memory: live inside one connection, so there is no pool to size
+IS_SQLITE_MEMORY = IS_SQLITE and make_url(DATABASE_URL).database in (None, "", ":memory:")
+
+POOL_SIZE = int(os.environ.get("CURESENSE_DB_POOL_SIZE", 5))
+POOL_MAX_OVERFLOW = int(os.environ.get("CURESENSE_DB_MAX_OVERFLOW", 10))
+POOL_TIMEOUT = int(os.environ.get("CURESENSE_DB_POOL_TIMEOUT", 30))
+POOL_RECYCLE = int(os.environ.get("CURESENSE_DB_POOL_RECYCLE", 1800))
+SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get("CURESENSE_SQLITE_BUSY_TIMEOUT_MS", 5000))
+
+if IS_SQLITE_MEMORY:
+    # One shared connection, so request threads and the history writer see the same database
+    POOL_ARGS = {"poolclass": StaticPool}
+else:
+    POOL_ARGS = {
+        "pool_size": POOL_SIZE,
+        "max_overflow": POOL_MAX_OVERFLOW,
+        "pool_timeout": POOL_TIMEOUT,
+        "pool_recycle": POOL_RECYCLE,
+        "pool_pre_ping": True,
+    }
 
 Base = declarative_base()
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+engine = create_engine(
+    DATABASE_URL,
+    connect_args={"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000} if IS_SQLITE else {},
+    **POOL_ARGS,
+)
 SessionLocal = sessionmaker(bind=engine)
+# With gunicorn --preload the app is imported before forking; children must
+# not reuse the parent's pooled connections.
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=lambda: engine.dispose(close=False))
+# Thread-local session for request handlers; the Flask app removes it on teardown.
+db_session = scoped_session(SessionLocal)
+
+@event.listens_for(engine, "connect")
+def _set_sqlite_pragmas(dbapi_conn, _):
+    """WAL lets readers run alongside the single writer instead of failing with "database is locked"."""
+    if not IS_SQLITE:
+        return
+    cursor = dbapi_conn.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.close()
 
 class User(Base):
     __tablename__ = 'users'
@@ -24,13 +70,107 @@ class History(Base):
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey('users.id'))
     symptoms = Column(Text)
+    # Legacy JSON lists; rows written since history_predictions/history_medications
+    # existed leave these NULL (see app/prediction_store.py)
     predicted_diseases = Column(Text)
     medications = Column(Text)
+    doctor_types = Column(Text)
+    model_version = Column(String)
+    # Diagnosis confirmed by a clinician; the label for incremental training
+    confirmed_disease = Column(String)
+    # Set on every (re)confirmation; incremental training resumes from the newest it has consumed
+    confirmed_at = Column(DateTime)
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
     user = relationship("User", back_populates="histories")
+    prediction_rows = relationship("HistoryPrediction", order_by="HistoryPrediction.rank")
+    medication_rows = relationship("HistoryMedication", order_by="HistoryMedication.rank")
+
+    # Serves /history's per-user, newest-first keyset pagination
+    __table_args__ = (Index('ix_history_user_created', 'user_id', 'created_at'),
+                      Index('ix_history_confirmed', 'confirmed_at', 'id'))
+
+class Disease(Base):
+    __tablename__ = 'diseases'
+    id = Column(Integer, primary_key=True)
+    name = Column(String, unique=True, nullable=False)
+
+class Medication(Base):
+    __tablename__ = 'medications'
+    id = Column(Integer, primary_key=True)
+    name = Column(String, unique=True, nullable=False)
+
+class HistoryPrediction(Base):
+    """One predicted disease of a History row, in rank order."""
+    __tablename__ = 'history_predictions'
+    history_id = Column(Integer, ForeignKey('history.id'), primary_key=True)
+    rank = Column(SmallInteger, primary_key=True)
+    disease_id = Column(Integer, ForeignKey('diseases.id'), nullable=False)
+    # Confidence percentage in hundredths (87.25% -> 8725); NULL for migrated rows, which never stored one
+    confidence = Column(SmallInteger)
+    # Copied from History so "predicting X since T" is answered from one index
+    created_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (Index('ix_history_predictions_disease_created', 'disease_id', 'created_at'),)
+
+class HistoryMedication(Base):
+    __tablename__ = 'history_medications'
+    history_id = Column(Integer, ForeignKey('history.id'), primary_key=True)
+    rank = Column(SmallInteger, primary_key=True)
+    medication_id = Column(Integer, ForeignKey('medications.id'), nullable=False)
+
+    __table_args__ = (Index('ix_history_medications_medication', 'medication_id'),)
+
+class UserDailyCount(Base):
+    """
+    Per-user, per-day prediction counters kept up to date by the history
+    writer; /history/stats sums these instead of scanning History.
+    kind is "total" (name "") or "disease", "medication", "doctor".
+    """
+    __tablename__ = 'user_daily_counts'
+    user_id = Column(Integer, ForeignKey('users.id'), primary_key=True)
+    day = Column(Date, primary_key=True)
+    kind = Column(String, primary_key=True)
+    name = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+def _add_missing_columns():
+    """create_all never alters existing tables, so add columns introduced since they were created."""
+    inspector = inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {c["name"] for c in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing:
+                column_type = column.type.compile(dialect=engine.dialect)
+                with engine.begin() as conn:
+                    conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
 
 def init_db():
     Base.metadata.create_all(bind=engine)
+    _add_missing_columns()
+    # create_all skips indexes on tables that already exist
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+    _backfill_daily_counts()
+
+def _backfill_daily_counts():
+    """Count History rows written before user_daily_counts existed, once, while that table is empty."""
+    session = SessionLocal()
+    try:
+        pending = (session.query(UserDailyCount.user_id).first() is None
+                   and session.query(History.id).filter(History.user_id.isnot(None)).first() is not None)
+    finally:
+        session.close()
+    if not pending:
+        return
+    # history_stats imports this module
+    from app.history_stats import rebuild
+    try:
+        print(f"✅ Counted {rebuild(SessionLocal)} existing history rows for /history/stats")
+    except Exception as e:
+        print(f"❌ Failed to build the daily counters, run python -m app.history_stats: {e}")
 
 if __name__ == "__main__":
     init_db()
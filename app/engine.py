@@ -0,0 +1,141 @@
+import json
+import os
+import numpy as np
+
+BUNDLE_FORMAT = 1
+
+
+class LinearEngine:
+    """
+    Linear (logistic) disease model flattened into a single weight matrix.
+
+    Row i of `weights` holds the coefficients of symptom i for every class,
+    so scoring a request is a gather-and-sum over the rows of the symptoms
+    present followed by a sigmoid (one-vs-rest) or softmax (multinomial).
+    """
+
+    def __init__(self, weights, intercepts, feature_names, classes, constants=None, normalize=False, link="sigmoid"):
+        self.weights = np.ascontiguousarray(weights, dtype=np.float64)
+        self.intercepts = np.asarray(intercepts, dtype=np.float64)
+        self.feature_names = [str(f) for f in feature_names]
+        self.classes = np.asarray(classes)
+        self.feature_index = {name: i for i, name in enumerate(self.feature_names)}
+        # Classes that were constant at fit time always predict their fixed value.
+        self.constants = None
+        if constants is not None and not np.all(np.isnan(constants)):
+            self.constants = np.asarray(constants, dtype=np.float64)
+        self.normalize = normalize
+        self.link = link
+
+    @classmethod
+    def from_sklearn(cls, model, mlb, feature_names=None):
+        """Stack the coef_/intercept_ of a fitted OneVsRestClassifier or multinomial LogisticRegression."""
+        if not hasattr(model, "estimators_"):
+            return cls.from_multinomial(model, mlb, feature_names)
+        if feature_names is None:
+            feature_names = model.estimators_[0].feature_names_in_
+        n_features, n_classes = len(feature_names), len(model.estimators_)
+
+        weights = np.zeros((n_features, n_classes))
+        intercepts = np.zeros(n_classes)
+        constants = np.full(n_classes, np.nan)
+        for j, est in enumerate(model.estimators_):
+            if hasattr(est, "coef_"):
+                weights[:, j] = est.coef_.ravel()
+                intercepts[j] = np.ravel(est.intercept_)[0]
+            else:
+                # sklearn's _ConstantPredictor for labels seen with a single value
+                constants[j] = float(np.ravel(est.y_)[0])
+
+        normalize = n_classes > 1 and not getattr(model, "multilabel_", True)
+        return cls(weights, intercepts, feature_names, mlb.classes_, constants, normalize)
+
+    @classmethod
+    def from_multinomial(cls, model, mlb, feature_names=None):
+        """
+        Convert a multinomial LogisticRegression trained on indices into
+        mlb.classes_. Classes absent from its training data get a -inf
+        intercept, so their softmax probability is exactly 0.
+        """
+        if feature_names is None:
+            feature_names = model.feature_names_in_
+        if model.coef_.shape[0] != len(model.classes_):
+            raise ValueError("Expected a multinomial model with one coefficient row per class")
+        n_classes = len(mlb.classes_)
+        weights = np.zeros((len(feature_names), n_classes))
+        intercepts = np.full(n_classes, -np.inf)
+        present = np.asarray(model.classes_, dtype=int)
+        weights[:, present] = model.coef_.T
+        intercepts[present] = model.intercept_
+        return cls(weights, intercepts, feature_names, mlb.classes_, link="softmax")
+
+    def save(self, path):
+        """
+        Write the engine as a directory of plain .npy arrays plus meta.json,
+        loadable without pickle, pandas or sklearn.
+        """
+        os.makedirs(path, exist_ok=True)
+        constants = self.constants if self.constants is not None else np.full(len(self.classes), np.nan)
+        np.save(os.path.join(path, "weights.npy"), self.weights)
+        np.save(os.path.join(path, "intercepts.npy"), self.intercepts)
+        np.save(os.path.join(path, "constants.npy"), constants)
+        np.save(os.path.join(path, "feature_names.npy"), np.asarray(self.feature_names, dtype=str))
+        np.save(os.path.join(path, "classes.npy"), np.asarray(self.classes, dtype=str))
+        with open(os.path.join(path, "meta.json"), "w") as f:
+            json.dump({"format": BUNDLE_FORMAT, "normalize": bool(self.normalize), "link": self.link}, f)
+
+    @classmethod
+    def load(cls, path, mmap_mode=None):
+        """
+        Load a saved bundle. With mmap_mode="r" the numeric arrays stay
+        memory-mapped read-only, so processes loading the same bundle share
+        its pages through the OS page cache instead of each holding a copy.
+        """
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode, allow_pickle=False)
+                  for name in ("weights", "intercepts", "constants")}
+        for name in ("feature_names", "classes"):
+            arrays[name] = np.load(os.path.join(path, f"{name}.npy"), allow_pickle=False)
+        return cls(arrays["weights"], arrays["intercepts"], arrays["feature_names"].tolist(),
+                   arrays["classes"], arrays["constants"], meta.get("normalize", False), meta.get("link", "sigmoid"))
+
+    def feature_indices(self, symptoms):
+        index = self.feature_index
+        return [index[s] for s in set(symptoms) if s in index]
+
+    def _finish(self, scores):
+        if self.link == "softmax":
+            exp = np.exp(scores - scores.max(axis=-1, keepdims=True))
+            return exp / exp.sum(axis=-1, keepdims=True)
+        probs = 1.0 / (1.0 + np.exp(-scores))
+        if self.constants is not None:
+            probs = np.where(np.isnan(self.constants), probs, self.constants)
+        if self.normalize:
+            probs = probs / probs.sum(axis=-1, keepdims=True)
+        return probs
+
+    def predict_proba(self, symptoms):
+        """Class probabilities for one list of cleaned symptom tokens."""
+        return self.predict_proba_indices(self.feature_indices(symptoms))
+
+    def predict_proba_indices(self, idx):
+        scores = self.intercepts + self.weights[idx].sum(axis=0) if idx else self.intercepts.copy()
+        return self._finish(scores)
+
+    def feature_matrix(self, symptom_lists):
+        X = np.zeros((len(symptom_lists), len(self.feature_names)))
+        for row, symptoms in enumerate(symptom_lists):
+            X[row, self.feature_indices(symptoms)] = 1
+        return X
+
+    def predict_proba_matrix(self, X):
+        return self._finish(X @ self.weights + self.intercepts)
+
+    def predict_proba_batch(self, symptom_lists):
+        """Class probabilities for many requests, scored as one feature matrix."""
+        return self.predict_proba_matrix(self.feature_matrix(symptom_lists))
+
+    def top_k(self, probs, top_k=3, threshold=0.01):
+        top_indices = np.argsort(probs)[::-1][:top_k]
+        return [(self.classes[i], round(float(probs[i]) * 100, 2)) for i in top_indices if probs[i] > threshold]
@@ -0,0 +1,125 @@
+import datetime
+import json
+from collections import Counter
+from sqlalchemy import func
+from sqlalchemy.dialects import postgresql, sqlite
+from app.db import History, UserDailyCount
+from app.prediction_store import decode
+
+KINDS = {"disease": "predicted_diseases", "medication": "medications", "doctor": "doctor_types"}
+TOP_N = 10
+REBUILD_BATCH = 5000
+
+
+def _names(value):
+    if not value:
+        return []
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return []
+    return [v for v in value if isinstance(v, str) and v]
+
+
+def count_rows(rows):
+    """
+    Counter of (user_id, day, kind, name) over history writer field dicts;
+    diseases come from "predictions" pairs when present.
+    """
+    counts = Counter()
+    for row in rows:
+        user_id = row.get("user_id")
+        if user_id is None:
+            continue
+        day = (row.get("created_at") or datetime.datetime.utcnow()).date()
+        counts[(user_id, day, "total", "")] += 1
+        for kind, field in KINDS.items():
+            if kind == "disease" and row.get("predictions") is not None:
+                names = [d for d, _ in row["predictions"]]
+            else:
+                names = _names(row.get(field))
+            for name in set(names):
+                counts[(user_id, day, kind, name)] += 1
+    return counts
+
+
+def apply_counts(session, counts):
+    """Add counts onto the stored counters, inserting rows that do not exist yet."""
+    if not counts:
+        return
+    rows = [{"user_id": u, "day": d, "kind": k, "name": n, "count": c} for (u, d, k, n), c in counts.items()]
+    dialect = session.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        insert = (sqlite if dialect == "sqlite" else postgresql).insert(UserDailyCount)
+        stmt = insert.on_conflict_do_update(
+            index_elements=["user_id", "day", "kind", "name"],
+            set_={"count": UserDailyCount.count + insert.excluded["count"]},
+        )
+        session.execute(stmt, rows)
+        return
+    for row in rows:
+        existing = session.get(UserDailyCount, (row["user_id"], row["day"], row["kind"], row["name"]))
+        if existing:
+            existing.count += row["count"]
+        else:
+            session.add(UserDailyCount(**row))
+
+
+def rebuild(session_factory, user_id=None):
+    """Recompute the counters from History, e.g. after a backfill or for rows written before they existed."""
+    session = session_factory()
+    try:
+        counters = session.query(UserDailyCount)
+        history = session.query(History).order_by(History.id)
+        if user_id is not None:
+            counters = counters.filter_by(user_id=user_id)
+            history = history.filter_by(user_id=user_id)
+        counters.delete(synchronize_session=False)
+        counts = Counter()
+        last_id = 0
+        while True:
+            page = history.filter(History.id > last_id).limit(REBUILD_BATCH).all()
+            if not page:
+                break
+            decoded = decode(session, page)
+            counts.update(count_rows({"user_id": h.user_id, "created_at": h.created_at,
+                                      "doctor_types": h.doctor_types, **decoded[h.id]} for h in page))
+            last_id = page[-1].id
+        apply_counts(session, counts)
+        session.commit()
+        return sum(c for (_, _, kind, _), c in counts.items() if kind == "total")
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+def user_stats(session, user_id, start=None, end=None, top=TOP_N):
+    """Totals and the top names of each kind for one user, over days start..end inclusive."""
+    query = (session.query(UserDailyCount.kind, UserDailyCount.name, func.sum(UserDailyCount.count))
+             .filter(UserDailyCount.user_id == user_id))
+    if start:
+        query = query.filter(UserDailyCount.day >= start)
+    if end:
+        query = query.filter(UserDailyCount.day <= end)
+    grouped = {kind: [] for kind in KINDS}
+    total = 0
+    for kind, name, count in query.group_by(UserDailyCount.kind, UserDailyCount.name):
+        if kind == "total":
+            total = int(count)
+        elif kind in grouped:
+            grouped[kind].append((name, int(count)))
+    result = {"total_predictions": total}
+    for kind, items in grouped.items():
+        items.sort(key=lambda item: (-item[1], item[0]))
+        result[f"unique_{kind}s"] = len(items)
+        result[f"top_{kind}s"] = [{"name": name, "count": count} for name, count in items[:top]]
+    return result
+
+
+if __name__ == "__main__":
+    from app.db import SessionLocal, init_db
+    init_db()
+    print(f"✅ Rebuilt daily counters from {rebuild(SessionLocal)} history rows")
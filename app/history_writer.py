@@ -0,0 +1,127 @@
+import atexit
+import datetime
+import os
+import queue
+import threading
+import time
+from app.db import SessionLocal
+from app.history_stats import apply_counts, count_rows
+from app.prediction_store import add_histories
+from app.metrics import STAGE_SECONDS, CallbackMetric, Counter
+
+MAX_DELAY = float(os.environ.get("CURESENSE_HISTORY_MAX_DELAY", 0.2))
+MAX_BATCH = int(os.environ.get("CURESENSE_HISTORY_MAX_BATCH", 500))
+MAX_QUEUE = int(os.environ.get("CURESENSE_HISTORY_MAX_QUEUE", 10000))
+
+_STOP = object()
+
+ROWS_DROPPED = Counter("curesense_history_rows_dropped_total", "History rows that could not be written and were discarded.")
+
+
+class HistoryWriter:
+    """
+    Write-behind queue for History rows.
+
+    Requests enqueue rows and return immediately; a background thread
+    drains the queue and commits up to max_batch rows per transaction,
+    waiting at most max_delay seconds after the first queued row.
+    """
+
+    def __init__(self, session_factory, max_delay=MAX_DELAY, max_batch=MAX_BATCH, max_queue=MAX_QUEUE):
+        self.session_factory = session_factory
+        self.max_delay = max_delay
+        self.max_batch = max_batch
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    def _ensure_started(self):
+        # Started lazily so each forked gunicorn worker gets its own thread.
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name="history-writer", daemon=True)
+                self._thread.start()
+
+    def submit(self, **fields):
+        """Queue one History row; falls back to a synchronous write when the queue is full."""
+        fields.setdefault("created_at", datetime.datetime.utcnow())
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(fields)
+        except queue.Full:
+            self._write([fields])
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                self._queue.task_done()
+                return
+            batch = [item]
+            stop = False
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+            self._write(batch)
+            for _ in range(len(batch) + stop):
+                self._queue.task_done()
+            if stop:
+                return
+
+    def _write(self, batch):
+        """Commit batch, retrying once; then row by row so one bad row cannot drop the others."""
+        if self._commit(batch) or self._commit(batch):
+            return
+        if len(batch) > 1:
+            print(f"⚠️ Writing {len(batch)} history rows one at a time")
+        for fields in batch:
+            if len(batch) == 1 or not self._commit([fields]):
+                ROWS_DROPPED.inc()
+
+    def _commit(self, batch):
+        session = self.session_factory()
+        try:
+            with STAGE_SECONDS.time("history_commit"):
+                add_histories(session, batch)
+                # Counters commit with the rows they count
+                apply_counts(session, count_rows(batch))
+                session.commit()
+            return True
+        except Exception as e:
+            session.rollback()
+            print(f"❌ Failed to write {len(batch)} history rows: {e}")
+            return False
+        finally:
+            session.close()
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def flush(self):
+        """Block until every queued row has been committed."""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.join()
+
+    def close(self):
+        """Flush pending rows and stop the writer thread."""
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+        self._thread = None
+
+
+history_writer = HistoryWriter(SessionLocal)
+CallbackMetric("curesense_history_queue_depth", "History rows waiting to be written.", history_writer.pending)
+atexit.register(history_writer.close)
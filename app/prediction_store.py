@@ -0,0 +1,186 @@
+"""
+Normalized storage for History predictions.
+
+Disease and medication names live once in the diseases/medications lookup
+tables. Each History row has ranked child rows in history_predictions
+(disease id plus confidence in hundredths of a percent) and
+history_medications. Ids come from the lookup tables rather than
+mlb.classes_ positions, because the class order can change whenever a new
+model version is published.
+
+Rows written before these tables existed keep their JSON text columns.
+Reads fall back to them until `python -m app.prediction_store` migrates
+them.
+"""
+
+import datetime
+import json
+import threading
+from collections import defaultdict
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from app.db import Disease, Medication, History, HistoryPrediction, HistoryMedication
+
+MIGRATE_BATCH = 2000
+
+# Lookup rows are never renamed or deleted, so cached ids never go stale
+_lock = threading.Lock()
+_ids = {Disease: {}, Medication: {}}
+_names = {Disease: {}, Medication: {}}
+
+
+def _remember(model, rows):
+    with _lock:
+        for id_, name in rows:
+            _ids[model][name] = id_
+            _names[model][id_] = name
+
+
+def resolve_ids(session, model, names):
+    """{name: id}, inserting names not seen before in their own committed transaction."""
+    missing = [n for n in set(names) if n not in _ids[model]]
+    if missing:
+        engine = session.get_bind()
+        with engine.begin() as conn:
+            if engine.dialect.name in ("sqlite", "postgresql"):
+                insert = (sqlite if engine.dialect.name == "sqlite" else postgresql).insert(model)
+                conn.execute(insert.on_conflict_do_nothing(index_elements=["name"]), [{"name": n} for n in missing])
+            else:
+                known = set(conn.scalars(select(model.name).where(model.name.in_(missing))))
+                for name in set(missing) - known:
+                    try:
+                        with conn.begin_nested():
+                            conn.execute(model.__table__.insert(), {"name": name})
+                    except IntegrityError:
+                        pass  # another worker inserted it first
+            _remember(model, conn.execute(select(model.id, model.name).where(model.name.in_(missing))))
+    return {n: _ids[model][n] for n in names}
+
+
+def names_for(session, model, ids):
+    """{id: name}, loading ids not cached yet."""
+    missing = [i for i in set(ids) if i not in _names[model]]
+    if missing:
+        _remember(model, session.execute(select(model.id, model.name).where(model.id.in_(missing))))
+    return {i: _names[model][i] for i in ids}
+
+
+def add_histories(session, batch):
+    """
+    Add History rows for history writer field dicts. "predictions" is a
+    [(disease, confidence %), ...] list and "medications" a list of names;
+    both are stored as child rows instead of JSON.
+    """
+    disease_ids = resolve_ids(session, Disease, [d for f in batch for d, _ in f.get("predictions") or ()])
+    medication_ids = resolve_ids(session, Medication, [m for f in batch for m in f.get("medications") or ()])
+    rows = []
+    for fields in batch:
+        fields = dict(fields)
+        predictions = fields.pop("predictions", None) or []
+        medications = fields.pop("medications", None) or []
+        h = History(**fields)
+        h.prediction_rows = [
+            HistoryPrediction(rank=rank, disease_id=disease_ids[d], confidence=round(c * 100), created_at=h.created_at)
+            for rank, (d, c) in enumerate(predictions)
+        ]
+        h.medication_rows = [HistoryMedication(rank=rank, medication_id=medication_ids[m])
+                             for rank, m in enumerate(dict.fromkeys(medications))]
+        rows.append(h)
+    session.add_all(rows)
+    return rows
+
+
+def _json_list(value):
+    try:
+        return json.loads(value) if value else []
+    except ValueError:
+        return []
+
+
+def decode(session, histories):
+    """
+    {history_id: {"predicted_diseases", "confidences", "medications"}} for
+    a page of History rows, in two queries however many rows there are.
+    confidences is None whenever none were stored.
+    """
+    ids = [h.id for h in histories]
+    predictions, medications = defaultdict(list), defaultdict(list)
+    if ids:
+        for history_id, disease_id, confidence in session.execute(
+                select(HistoryPrediction.history_id, HistoryPrediction.disease_id, HistoryPrediction.confidence)
+                .where(HistoryPrediction.history_id.in_(ids))
+                .order_by(HistoryPrediction.history_id, HistoryPrediction.rank)):
+            predictions[history_id].append((disease_id, confidence))
+        for history_id, medication_id in session.execute(
+                select(HistoryMedication.history_id, HistoryMedication.medication_id)
+                .where(HistoryMedication.history_id.in_(ids))
+                .order_by(HistoryMedication.history_id, HistoryMedication.rank)):
+            medications[history_id].append(medication_id)
+    disease_names = names_for(session, Disease, {d for rows in predictions.values() for d, _ in rows})
+    medication_names = names_for(session, Medication, {m for rows in medications.values() for m in rows})
+
+    decoded = {}
+    for h in histories:
+        if h.predicted_diseases is not None or h.medications is not None:
+            decoded[h.id] = {"predicted_diseases": _json_list(h.predicted_diseases), "confidences": None,
+                             "medications": _json_list(h.medications)}
+            continue
+        rows = predictions.get(h.id, [])
+        # Migrated rows never had confidences: report them as null, exactly like unmigrated ones
+        stored = bool(rows) and all(c is not None for _, c in rows)
+        decoded[h.id] = {
+            "predicted_diseases": [disease_names[d] for d, _ in rows],
+            "confidences": [c / 100 for _, c in rows] if stored else None,
+            "medications": [medication_names[m] for m in medications.get(h.id, [])],
+        }
+    return decoded
+
+
+def histories_predicting(session, disease, since=None):
+    """History rows that predicted disease (at any rank), optionally only those created at or after since."""
+    disease_id = session.scalar(select(Disease.id).where(Disease.name == disease))
+    query = (session.query(History).join(HistoryPrediction, HistoryPrediction.history_id == History.id)
+             .filter(HistoryPrediction.disease_id == disease_id))
+    if since is not None:
+        query = query.filter(HistoryPrediction.created_at >= since)
+    return query
+
+
+def migrate(session_factory, batch_size=MIGRATE_BATCH):
+    """Move JSON predicted_diseases/medications into the child tables; safe to rerun. Returns rows migrated."""
+    migrated = 0
+    while True:
+        session = session_factory()
+        try:
+            histories = (session.query(History)
+                         .filter((History.predicted_diseases.isnot(None)) | (History.medications.isnot(None)))
+                         .order_by(History.id).limit(batch_size).all())
+            if not histories:
+                return migrated
+            diseases = {h.id: [d for d in _json_list(h.predicted_diseases) if isinstance(d, str)] for h in histories}
+            medications = {h.id: list(dict.fromkeys(m for m in _json_list(h.medications) if isinstance(m, str)))
+                           for h in histories}
+            disease_ids = resolve_ids(session, Disease, [d for names in diseases.values() for d in names])
+            medication_ids = resolve_ids(session, Medication, [m for names in medications.values() for m in names])
+            for h in histories:
+                created_at = h.created_at or datetime.datetime.utcnow()
+                session.add_all(HistoryPrediction(history_id=h.id, rank=rank, disease_id=disease_ids[d],
+                                                  confidence=None, created_at=created_at)
+                                for rank, d in enumerate(diseases[h.id]))
+                session.add_all(HistoryMedication(history_id=h.id, rank=rank, medication_id=medication_ids[m])
+                                for rank, m in enumerate(medications[h.id]))
+                h.predicted_diseases = h.medications = None
+            session.commit()
+            migrated += len(histories)
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+
+if __name__ == "__main__":
+    from app.db import SessionLocal, init_db
+    init_db()
+    print(f"✅ Migrated {migrate(SessionLocal)} history rows to normalized prediction storage")
@@ -0,0 +1,9 @@
+import re
+
+
+def preprocess_text(text: str) -> list:
+    """Convert input text into clean symptom tokens."""
+    text = text.lower()
+    text = re.sub(r"[^a-z,\s]", "", text)
+    symptoms = [s.strip() for s in text.split(",") if s.strip()]
+    return symptoms
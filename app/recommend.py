@@ -0,0 +1,74 @@
+FALLBACK_INFO = {"meds": ["Consult Doctor", "Hydration", "Rest"], "doctors": ["General Physician"]}
+# Names outside the model's classes are memoised up to this many entries
+MAX_EXTRA_NAMES = 10000
+
+
+def _decode(mask, names):
+    """Names for the set bits of mask, lowest bit first."""
+    out = []
+    while mask:
+        low = mask & -mask
+        out.append(names[low.bit_length() - 1])
+        mask ^= low
+    return out
+
+
+class RecommendationTable:
+    """
+    Meds and doctors for every model class, resolved once at load time.
+
+    Every medication and doctor gets one bit, numbered in sorted name order,
+    and each class stores the OR of its bits. A request merges a few ints
+    and decodes the result straight into sorted lists.
+    """
+
+    def __init__(self, classes, disease_map, category_map):
+        self.disease_map = {k.lower().strip(): v for k, v in disease_map.items()}
+        self.category_map = category_map
+
+        infos = list(self.disease_map.values()) + list(category_map.values()) + [FALLBACK_INFO]
+        self.med_names = sorted({m for info in infos for m in info["meds"]})
+        self.doctor_names = sorted({d for info in infos for d in info["doctors"]})
+        self._med_bits = {name: 1 << i for i, name in enumerate(self.med_names)}
+        self._doctor_bits = {name: 1 << i for i, name in enumerate(self.doctor_names)}
+
+        self.class_index = {str(c): i for i, c in enumerate(classes)}
+        self.masks = [self._masks(str(c)) for c in classes]
+        self._extra = {}
+
+    def resolve(self, disease):
+        """The catalogue entry a disease name maps to."""
+        disease = disease.lower().strip()
+        if disease in self.disease_map:
+            return self.disease_map[disease]
+        for key, info in self.category_map.items():
+            if key in disease:
+                return info
+        return FALLBACK_INFO
+
+    def _masks(self, disease):
+        info = self.resolve(disease)
+        med_mask = 0
+        for m in info["meds"]:
+            med_mask |= self._med_bits[m]
+        doctor_mask = 0
+        for d in info["doctors"]:
+            doctor_mask |= self._doctor_bits[d]
+        return med_mask, doctor_mask
+
+    def lookup(self, diseases):
+        """Sorted (meds, doctors) for an iterable of disease names."""
+        med_mask = doctor_mask = 0
+        for d in diseases:
+            i = self.class_index.get(d)
+            if i is not None:
+                masks = self.masks[i]
+            else:
+                masks = self._extra.get(d)
+                if masks is None:
+                    masks = self._masks(d)
+                    if len(self._extra) < MAX_EXTRA_NAMES:
+                        self._extra[d] = masks
+            med_mask |= masks[0]
+            doctor_mask |= masks[1]
+        return _decode(med_mask, self.med_names), _decode(doctor_mask, self.doctor_names)
@@ -0,0 +1,66 @@
+"""
+Versioned model store.
+
+    models/registry/
+        20261016-120000/   <- LinearEngine bundle (see LinearEngine.save)
+        20261017-093000/
+        CURRENT            <- name of the version servers should load
+
+Versions are published by writing to a temporary directory and renaming
+it into place, and CURRENT is replaced atomically, so a server polling
+the registry never sees a half-written model. Old versions are kept:
+servers may still have them memory-mapped.
+"""
+
+import datetime
+import os
+import shutil
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+REGISTRY_DIR = os.environ.get("CURESENSE_MODEL_REGISTRY", os.path.join(BASE_DIR, "../models/registry"))
+CURRENT_FILE = "CURRENT"
+
+
+def version_path(version, registry_dir=REGISTRY_DIR):
+    return os.path.join(registry_dir, version)
+
+
+def list_versions(registry_dir=REGISTRY_DIR):
+    if not os.path.isdir(registry_dir):
+        return []
+    return sorted(v for v in os.listdir(registry_dir)
+                  if not v.startswith(".") and os.path.isfile(os.path.join(registry_dir, v, "meta.json")))
+
+
+def current_version(registry_dir=REGISTRY_DIR):
+    try:
+        with open(os.path.join(registry_dir, CURRENT_FILE)) as f:
+            version = f.read().strip()
+    except FileNotFoundError:
+        return None
+    return version or None
+
+
+def set_current(version, registry_dir=REGISTRY_DIR):
+    if not os.path.isfile(os.path.join(version_path(version, registry_dir), "meta.json")):
+        raise ValueError(f"Unknown model version: {version}")
+    tmp = os.path.join(registry_dir, f".{CURRENT_FILE}.{os.getpid()}")
+    with open(tmp, "w") as f:
+        f.write(version + "\n")
+    os.replace(tmp, os.path.join(registry_dir, CURRENT_FILE))
+
+
+def publish(engine, version=None, activate=True, registry_dir=REGISTRY_DIR):
+    """Save engine as a new registry version and optionally make it current."""
+    version = version or datetime.datetime.utcnow().strftime("%Y%m%d-%H%M%S")
+    final = version_path(version, registry_dir)
+    if os.path.exists(final):
+        raise ValueError(f"Model version already exists: {version}")
+    os.makedirs(registry_dir, exist_ok=True)
+    tmp = os.path.join(registry_dir, f".tmp-{version}")
+    shutil.rmtree(tmp, ignore_errors=True)
+    engine.save(tmp)
+    os.rename(tmp, final)
+    if activate:
+        set_current(version, registry_dir)
+    return version
@@ -1,44 +1,180 @@
-import numpy as np
-import pandas as pd
-import re
-from joblib import load
+import json
 import os
+import threading
+import time
+from app.engine import LinearEngine
+from app.cache import PredictionCache
+from app.recommend import RecommendationTable
+from app.batching import MicroBatcher
+from app.metrics import STAGE_SECONDS, CallbackMetric
+from app.preprocess import preprocess_text
+from app import registry
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 MODEL_PATH = os.path.join(BASE_DIR, "../models/model.pkl")
 MLB_PATH = os.path.join(BASE_DIR, "../models/mlb.pkl")
-
-model = load(MODEL_PATH)
-mlb = load(MLB_PATH)
-
-def preprocess_text(text: str) -> list:
-    """Convert input text into clean symptom tokens."""
-    text = text.lower()
-    text = re.sub(r"[^a-z,\s]", "", text)
-    symptoms = [s.strip() for s in text.split(",") if s.strip()]
-    return symptoms
+# Written by training/export_model.py; used when the registry has no current version
+BUNDLE_PATH = os.environ.get("CURESENSE_MODEL_BUNDLE", os.path.join(BASE_DIR, "../models/model_bundle"))
+# "auto" tries the registry, then the bundle, then the pickles;
+# "registry", "bundle" and "pickle" force one source
+MODEL_FORMAT = os.environ.get("CURESENSE_MODEL_FORMAT", "auto")
+# Memory-map bundle weights read-only so gunicorn workers share one copy
+MODEL_MMAP = os.environ.get("CURESENSE_MODEL_MMAP", "1").lower() in ("1", "true", "yes")
+# Seconds between checks of the registry's CURRENT pointer; 0 disables hot reload
+MODEL_WATCH_INTERVAL = float(os.environ.get("CURESENSE_MODEL_WATCH_INTERVAL", 5))
+MED_CATALOG_PATH = os.environ.get("CURESENSE_MED_CATALOG", os.path.join(BASE_DIR, "../data/medications.json"))
+
+CACHE_SIZE = int(os.environ.get("CURESENSE_CACHE_SIZE", 4096))
+CACHE_TTL = float(os.environ.get("CURESENSE_CACHE_TTL", 3600))
+# Opt-in: score concurrent requests together in small batches
+MICROBATCH = os.environ.get("CURESENSE_MICROBATCH", "0").lower() in ("1", "true", "yes")
+MICROBATCH_MAX_SIZE = int(os.environ.get("CURESENSE_MICROBATCH_MAX_SIZE", 32))
+MICROBATCH_MAX_WAIT_US = int(os.environ.get("CURESENSE_MICROBATCH_MAX_WAIT_US", 500))
+
+prediction_cache = PredictionCache(CACHE_SIZE, CACHE_TTL)
+CallbackMetric("curesense_cache_hits_total", "Prediction cache hits.", lambda: prediction_cache.hits, "counter")
+CallbackMetric("curesense_cache_misses_total", "Prediction cache misses.", lambda: prediction_cache.misses, "counter")
+CallbackMetric("curesense_cache_evictions_total", "Prediction cache evictions.", lambda: prediction_cache.evictions, "counter")
+model_generation = 0
+_load_lock = threading.RLock()
+_watcher_lock = threading.Lock()
+_watcher = None
+_watcher_pid = None
+
+
+class ModelState:
+    """Everything a prediction needs from one model version, swapped in as a unit."""
+
+    def __init__(self, engine, version, generation):
+        self.engine = engine
+        self.version = version
+        self.generation = generation
+        self.recommendations = RecommendationTable(engine.classes, DISEASE_MED_MAP, DEFAULT_CATEGORY_MAP)
+
+    def warm_up(self):
+        """Fault in every weight page and run each scoring path once before serving."""
+        eng = self.engine
+        float(eng.weights.sum())
+        sample = eng.feature_names[:5]
+        eng.top_k(eng.predict_proba(sample))
+        eng.predict_proba_batch([sample, sample[:1], []])
+        self.recommendations.lookup(str(c) for c in eng.classes[:3])
+
+
+def load_model(version=None):
+    """
+    Load a model version (default: the registry's current one), warm it up,
+    then atomically swap it in and invalidate cached predictions. Requests
+    already running finish on the state they started with.
+    """
+    with _load_lock:
+        mmap_mode = "r" if MODEL_MMAP else None
+        if MODEL_FORMAT in ("auto", "registry"):
+            version = version or registry.current_version()
+        if MODEL_FORMAT in ("auto", "registry") and version:
+            new_engine = LinearEngine.load(registry.version_path(version), mmap_mode)
+        elif MODEL_FORMAT == "bundle" or (MODEL_FORMAT == "auto" and os.path.isdir(BUNDLE_PATH)):
+            version = "model_bundle"
+            new_engine = LinearEngine.load(BUNDLE_PATH, mmap_mode)
+        else:
+            # Only this fallback path needs joblib, and through it sklearn
+            from joblib import load
+            version = "model.pkl"
+            new_engine = LinearEngine.from_sklearn(load(MODEL_PATH), load(MLB_PATH))
+        return swap_engine(new_engine, version)
+
+def swap_engine(new_engine, version):
+    """Warm up an already-built engine, then make it the served model."""
+    global engine, recommendations, state, model_generation
+    with _load_lock:
+        new_state = ModelState(new_engine, version, model_generation + 1)
+        new_state.warm_up()
+        model_generation = new_state.generation
+        state = new_state
+        engine, recommendations = new_state.engine, new_state.recommendations
+        prediction_cache.clear()
+        return new_state
+
+def start_model_watcher(interval=MODEL_WATCH_INTERVAL):
+    """Start (once per process) a thread that follows the registry's CURRENT pointer."""
+    global _watcher, _watcher_pid
+    if interval <= 0 or MODEL_FORMAT not in ("auto", "registry"):
+        return
+    if _watcher is not None and _watcher_pid == os.getpid():
+        return
+    with _watcher_lock:
+        if _watcher is None or _watcher_pid != os.getpid():
+            _watcher_pid = os.getpid()
+            _watcher = threading.Thread(target=_watch_registry, args=(interval,), name="model-watcher", daemon=True)
+            _watcher.start()
+
+def _watch_registry(interval):
+    failed = None
+    while True:
+        time.sleep(interval)
+        try:
+            version = registry.current_version()
+        except Exception as e:
+            # Registry temporarily unreadable (e.g. a network mount); try again next tick
+            print(f"❌ Failed to read the model registry: {e}")
+            continue
+        if not version or version == state.version or version == failed:
+            continue
+        try:
+            load_model(version)
+            print(f"🔄 Now serving model version {version}")
+        except Exception as e:
+            # Remember it so a broken version is not reloaded every tick
+            failed = version
+            print(f"❌ Failed to load model version {version}: {e}")
 
 def predict_diseases(symptom_text: str, top_k=3):
     """Predict top diseases for given symptoms."""
-    symptoms = preprocess_text(symptom_text)
-
-    feature_names = model.estimators_[0].feature_names_in_
-    input_vector = np.zeros(len(feature_names))
-
-    for i, s in enumerate(feature_names):
-        if s in symptoms:
-            input_vector[i] = 1
-
-    import pandas as pd
-    input_df = pd.DataFrame([input_vector], columns=feature_names)
-
-    probs = model.predict_proba(input_df)[0]
-    classes = mlb.classes_
-
-    top_indices = np.argsort(probs)[::-1][:top_k]
-    top_diseases = [(classes[i], round(float(probs[i]) * 100, 2)) for i in top_indices if probs[i] > 0.01]
-
-    return top_diseases
+    with STAGE_SECONDS.time("preprocess"):
+        symptoms = preprocess_text(symptom_text)
+    return _predict_symptoms(symptoms, top_k, state)
+
+def _predict_symptoms(symptoms, top_k, st):
+    if _batcher is not None:
+        with STAGE_SECONDS.time("microbatch"):
+            return _batcher.submit((symptoms, top_k, st))
+    eng = st.engine
+    with STAGE_SECONDS.time("vectorize"):
+        idx = eng.feature_indices(symptoms)
+    with STAGE_SECONDS.time("predict_proba"):
+        probs = eng.predict_proba_indices(idx)
+    with STAGE_SECONDS.time("top_k"):
+        return eng.top_k(probs, top_k)
+
+def _score_batch(items):
+    """Score (symptoms, top_k, state) triples queued by the micro-batcher, one matrix per model state."""
+    groups = {}
+    for i, (_, _, st) in enumerate(items):
+        groups.setdefault(st, []).append(i)
+    results = [None] * len(items)
+    for st, rows in groups.items():
+        eng = st.engine
+        probs = eng.predict_proba_batch([items[i][0] for i in rows])
+        for i, p in zip(rows, probs):
+            results[i] = eng.top_k(p, items[i][1])
+    return results
+
+_batcher = MicroBatcher(_score_batch, MICROBATCH_MAX_SIZE, MICROBATCH_MAX_WAIT_US) if MICROBATCH else None
+
+def predict_diseases_batch(symptom_texts, top_k=3):
+    """Predict top diseases for many symptom strings with one matrix product."""
+    return _predict_batch(symptom_texts, top_k, state)
+
+def _predict_batch(symptom_texts, top_k, st):
+    eng = st.engine
+    with STAGE_SECONDS.time("batch_preprocess"):
+        symptom_lists = [preprocess_text(t) for t in symptom_texts]
+    with STAGE_SECONDS.time("batch_vectorize"):
+        X = eng.feature_matrix(symptom_lists)
+    with STAGE_SECONDS.time("batch_predict_proba"):
+        probs = eng.predict_proba_matrix(X)
+    with STAGE_SECONDS.time("batch_top_k"):
+        return [eng.top_k(p, top_k) for p in probs]
 
 DISEASE_MED_MAP = {
     "flu": {"meds": ["Paracetamol", "Rest", "Fluids"], "doctors": ["General Physician"]},
@@ -65,27 +201,55 @@ DEFAULT_CATEGORY_MAP = {
     "fever": {"meds": ["Paracetamol", "Rest", "Fluids"], "doctors": ["General Physician"]},
 }
 
+def load_med_catalog(path=MED_CATALOG_PATH):
+    """
+    Extra disease entries from a JSON file of the same shape as DISEASE_MED_MAP:
+    {"disease name": {"meds": [...], "doctors": [...]}, ...}
+    """
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        catalog = json.load(f)
+    return {k.lower().strip(): {"meds": list(v.get("meds", [])), "doctors": list(v.get("doctors", []))}
+            for k, v in catalog.items()}
 
-def recommend_for_diseases(disease_list):
-    meds, docs = set(), set()
+DISEASE_MED_MAP.update(load_med_catalog())
 
-    for d, _ in disease_list:
-        disease = d.lower().strip()
+load_model()
 
-        if disease in DISEASE_MED_MAP:
-            info = DISEASE_MED_MAP[disease]
-            meds.update(info["meds"])
-            docs.update(info["doctors"])
-            continue
 
-        for key, info in DEFAULT_CATEGORY_MAP.items():
-            if key in disease:
-                meds.update(info["meds"])
-                docs.update(info["doctors"])
-                break
-
-        if not any(key in disease for key in DEFAULT_CATEGORY_MAP.keys()):
-            meds.update(["Consult Doctor", "Hydration", "Rest"])
-            docs.update(["General Physician"])
-
-    return sorted(meds), sorted(docs)
+def recommend_for_diseases(disease_list):
+    return state.recommendations.lookup(d for d, _ in disease_list)
+
+
+def analyze_symptoms(symptom_text: str, top_k=3):
+    """
+    Cached predict_diseases + recommend_for_diseases.
+    Inputs naming the same symptom set in any order or case share one entry.
+    Returns (disease_confidences, meds, docs, model_version).
+    """
+    st = state
+    with STAGE_SECONDS.time("preprocess"):
+        symptoms = preprocess_text(symptom_text)
+    key = (st.generation, frozenset(symptoms), top_k)
+    with STAGE_SECONDS.time("cache_lookup"):
+        result = prediction_cache.get(key)
+    if result is None:
+        disease_confidences = _predict_symptoms(symptoms, top_k, st)
+        with STAGE_SECONDS.time("recommend"):
+            meds, docs = st.recommendations.lookup(d for d, _ in disease_confidences)
+        result = (disease_confidences, meds, docs, st.version)
+        prediction_cache.put(key, result)
+    return result
+
+
+def analyze_batch(symptom_texts, top_k=3):
+    """
+    predict_diseases_batch + recommend_for_diseases, all on one model version.
+    Returns ([(disease_confidences, meds, docs), ...], model_version).
+    """
+    st = state
+    predictions = _predict_batch(symptom_texts, top_k, st)
+    with STAGE_SECONDS.time("batch_recommend"):
+        results = [(dc, *st.recommendations.lookup(d for d, _ in dc)) for dc in predictions]
+    return results, st.version
@@ -0,0 +1,15 @@
+import os
+
+# gunicorn -c gunicorn.conf.py app.app:app
+bind = os.environ.get("CURESENSE_BIND", f"0.0.0.0:{os.environ.get('PORT', '5000')}")
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+threads = int(os.environ.get("CURESENSE_THREADS", 4))
+worker_class = "gthread"
+
+# Set CURESENSE_SECRET_KEY to a long random value. Without it the app makes
+# up a key at import, so tokens stop verifying after every restart, and with
+# CURESENSE_PRELOAD=0 each worker rejects tokens issued by the others.
+
+# Import the app (and map the model bundle) once in the master, then fork:
+# workers share those pages copy-on-write instead of each loading the model.
+preload_app = os.environ.get("CURESENSE_PRELOAD", "1").lower() in ("1", "true", "yes")
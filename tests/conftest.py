@@ -0,0 +1,94 @@
+"""
+Test environment: a throwaway SQLite database and a small model bundle.
+
+Both are configured through the same environment variables production
+uses, and that has to happen before anything imports app.db or
+app.utils. Those modules read the settings at import time.
+"""
+
+import itertools
+import os
+import tempfile
+import numpy as np
+import pytest
+from sklearn.linear_model import LogisticRegression
+from sklearn.multiclass import OneVsRestClassifier
+from sklearn.preprocessing import MultiLabelBinarizer
+
+FEATURES = ["fever", "cough", "headache", "nausea", "rash", "fatigue"]
+CLASSES = ["cold", "flu", "migraine", "measles"]
+
+_tmp = tempfile.mkdtemp(prefix="curesense-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp, 'test.db')}"
+os.environ["CURESENSE_SECRET_KEY"] = "test-secret"
+os.environ["CURESENSE_MODEL_FORMAT"] = "bundle"
+os.environ["CURESENSE_MODEL_BUNDLE"] = os.path.join(_tmp, "bundle")
+os.environ["CURESENSE_MODEL_REGISTRY"] = os.path.join(_tmp, "registry")
+os.environ["CURESENSE_MODEL_WATCH_INTERVAL"] = "0"
+os.environ["CURESENSE_HISTORY_MAX_DELAY"] = "0.01"
+
+
+def training_data(n=400, seed=0):
+    """Random symptom rows whose label depends on which symptoms are present."""
+    rng = np.random.default_rng(seed)
+    X = (rng.random((n, len(FEATURES))) < 0.35).astype(np.uint8)
+    y = (X[:, 0] + 2 * X[:, 2] + X[:, 4]) % len(CLASSES)
+    return X, y
+
+
+def fitted_ovr():
+    X, y = training_data()
+    mlb = MultiLabelBinarizer(classes=CLASSES)
+    Y = mlb.fit_transform([[CLASSES[i]] for i in y])
+    clf = OneVsRestClassifier(LogisticRegression(max_iter=500, solver="liblinear")).fit(X, Y)
+    return clf, mlb, X
+
+
+def _write_bundle():
+    from app.engine import LinearEngine
+    clf, mlb, _ = fitted_ovr()
+    LinearEngine.from_sklearn(clf, mlb, FEATURES).save(os.environ["CURESENSE_MODEL_BUNDLE"])
+
+
+_write_bundle()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    from app.db import init_db
+    init_db()
+
+
+_usernames = itertools.count()
+
+
+def add_history_rows(user_id, created):
+    """History rows for user_id at the given created_at values, through the writer's storage path."""
+    from app.db import SessionLocal
+    from app import prediction_store
+    session = SessionLocal()
+    try:
+        rows = prediction_store.add_histories(session, [
+            {"user_id": user_id, "symptoms": f"row {i}", "created_at": at,
+             "predictions": [("flu", 61.5), ("cold", 20.25)], "medications": ["Rest", "Hydration"]}
+            for i, at in enumerate(created)])
+        session.commit()
+        return [r.id for r in rows]
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def client():
+    from app.app import app
+    return app.test_client()
+
+
+@pytest.fixture
+def user(client):
+    """A fresh registered user: (user_id, auth headers)."""
+    from app.auth import verify_token
+    name, password = f"user{next(_usernames)}-{os.getpid()}", "pw"
+    assert client.post("/auth/register", json={"username": name, "password": password}).status_code == 200
+    token = client.post("/auth/login", json={"username": name, "password": password}).json["token"]
+    return verify_token(token)["uid"], {"Authorization": f"Bearer {token}"}
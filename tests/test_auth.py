@@ -0,0 +1,45 @@
+import time
+import types
+from app import auth
+
+
+def _user(id=7, username="alice"):
+    return types.SimpleNamespace(id=id, username=username)
+
+
+def test_issued_token_verifies_with_and_without_bearer_prefix():
+    token = auth.issue_token(_user())
+    for value in (token, f"Bearer {token}"):
+        claims = auth.verify_token(value)
+        assert claims["u"] == "alice" and claims["uid"] == 7
+
+
+def test_missing_or_garbage_tokens_are_rejected():
+    for value in (None, "", "Bearer ", "no-dot", "a.b", "%%%.###"):
+        assert auth.verify_token(value) is None
+
+
+def test_forged_claims_are_rejected():
+    token = auth.issue_token(_user())
+    body, signature = token.split(".")
+    forged_body = auth._b64encode(b'{"u":"mallory","uid":1,"exp":9999999999}')
+    assert auth.verify_token(f"{forged_body}.{signature}") is None
+    assert auth.verify_token(f"{body}.{signature[:-2]}xx") is None
+
+
+def test_token_signed_with_another_key_is_rejected(monkeypatch):
+    token = auth.issue_token(_user())
+    monkeypatch.setattr(auth, "SECRET_KEY", b"another-key")
+    assert auth.verify_token(token) is None
+
+
+def test_expired_token_is_rejected(monkeypatch):
+    monkeypatch.setattr(auth, "TOKEN_TTL", -1)
+    assert auth.verify_token(auth.issue_token(_user())) is None
+
+
+def test_token_expires_after_ttl(monkeypatch):
+    token = auth.issue_token(_user())
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + auth.TOKEN_TTL + 1)
+    assert auth.verify_token(token) is None
@@ -0,0 +1,70 @@
+import threading
+import pytest
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import MultiLabelBinarizer
+from app import utils
+from app.batching import MicroBatcher
+from app.engine import LinearEngine
+from tests.conftest import CLASSES, FEATURES, training_data
+
+
+def _submit_all(batcher, items):
+    results = [None] * len(items)
+    barrier = threading.Barrier(len(items))
+
+    def call(i):
+        barrier.wait()
+        results[i] = batcher.submit(items[i])
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(len(items))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+def test_each_caller_gets_its_own_result():
+    sizes = []
+
+    def score(items):
+        sizes.append(len(items))
+        return [item * 10 for item in items]
+    batcher = MicroBatcher(score, max_batch=4, max_wait_us=20000)
+    assert _submit_all(batcher, list(range(16))) == [i * 10 for i in range(16)]
+    assert sum(sizes) == 16 and max(sizes) <= 4 and len(sizes) < 16
+
+
+def test_a_failed_batch_fails_only_its_callers():
+    def score(items):
+        if "bad" in items:
+            raise ValueError("bad batch")
+        return items
+    batcher = MicroBatcher(score, max_batch=8, max_wait_us=0)
+    with pytest.raises(ValueError):
+        batcher.submit("bad")
+    assert batcher.submit("good") == "good"
+
+
+def test_batched_predictions_match_direct_ones(monkeypatch):
+    texts = ["fever, rash", "cough", "headache, nausea, fatigue", "unknown"]
+    direct = [utils.predict_diseases(t) for t in texts]
+    monkeypatch.setattr(utils, "_batcher", MicroBatcher(utils._score_batch, max_batch=8, max_wait_us=20000))
+    assert _submit_all(_Predictor(), texts) == direct
+
+
+def test_score_batch_scores_each_row_on_its_own_model_state():
+    clf = LogisticRegression(max_iter=500).fit(*training_data(seed=1))
+    mlb = MultiLabelBinarizer(classes=CLASSES).fit([CLASSES])
+    state = utils.state
+    other = utils.ModelState(LinearEngine.from_sklearn(clf, mlb, FEATURES), "other", state.generation + 100)
+    items = [(["fever", "rash"], 2, state), (["fever", "rash"], 2, other), (["cough"], 3, state)]
+    expected = [st.engine.top_k(st.engine.predict_proba(s), k) for s, k, st in items]
+    assert expected[0] != expected[1]
+    assert utils._score_batch(items) == expected
+
+
+class _Predictor:
+    """submit() front end so _submit_all can drive predict_diseases from many threads."""
+
+    def submit(self, text):
+        return utils.predict_diseases(text)
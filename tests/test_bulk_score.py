@@ -0,0 +1,36 @@
+import json
+from training import bulk_score
+
+
+class _ImmediatePool:
+    """apply_async that runs at once, recording how far ahead of the writer the input was read."""
+
+    def __init__(self):
+        self.submitted = 0
+
+    def apply_async(self, fn, args):
+        self.submitted += 1
+        result = fn(*args)
+        return type("Result", (), {"get": lambda _: result})()
+
+
+def test_input_is_read_at_most_a_window_ahead(monkeypatch):
+    monkeypatch.setattr(bulk_score, "_score_packed", lambda chunk: chunk)
+    pool = _ImmediatePool()
+    chunks = ([i] for i in range(10))
+    ahead = []
+    for n, result in enumerate(bulk_score._scored_in_order(pool, chunks, window=3)):
+        ahead.append(pool.submitted - n)
+        assert result == [n]
+    assert max(ahead) <= 3 and len(ahead) == 10
+
+
+def test_bulk_score_writes_every_row_in_order(tmp_path):
+    source = tmp_path / "records.jsonl"
+    source.write_text('{"id": "a", "symptoms": "fever"}\n"cough, rash"\nnot json\n{"symptoms": ""}\n"headache"\n')
+    output = tmp_path / "scored.jsonl"
+    assert bulk_score.bulk_score(str(source), str(output), workers=1, chunk_size=2) == (5, 2)
+    rows = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [r["index"] for r in rows] == [0, 1, 2, 3, 4]
+    assert rows[0]["id"] == "a" and "error" in rows[2] and "error" in rows[3]
+    assert all("predicted_diseases" in rows[i] for i in (0, 1, 4))
@@ -0,0 +1,50 @@
+from app import utils
+from app.cache import PredictionCache
+
+
+def test_lru_eviction_and_counters():
+    cache = PredictionCache(maxsize=2, ttl=0)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None and cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats() == {"size": 2, "maxsize": 2, "hits": 3, "misses": 1, "evictions": 1}
+
+
+def test_entries_expire_after_the_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("app.cache.time.monotonic", lambda: now[0])
+    cache = PredictionCache(maxsize=10, ttl=60)
+    cache.put("a", 1)
+    now[0] += 59
+    assert cache.get("a") == 1
+    now[0] += 2
+    assert cache.get("a") is None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_the_same_symptom_set_shares_one_entry():
+    utils.prediction_cache.clear()
+    first = utils.analyze_symptoms("Fever, Rash")
+    hits = utils.prediction_cache.hits
+    for text in ("rash,fever", "  RASH , fever, fever ", "fever,, rash,"):
+        assert utils.analyze_symptoms(text) is first
+    assert utils.prediction_cache.hits == hits + 3
+    assert utils.analyze_symptoms("fever, rash", top_k=1) is not first
+
+
+def test_swapping_the_model_invalidates_cached_predictions():
+    utils.prediction_cache.clear()
+    before = utils.state
+    first = utils.analyze_symptoms("fever, cough")
+    stale_key = (before.generation, frozenset(["fever", "cough"]), 3)
+    try:
+        utils.swap_engine(before.engine, "swapped")
+        # Anything a request still running on the old state puts back is keyed by the old generation
+        utils.prediction_cache.put(stale_key, first)
+        after = utils.analyze_symptoms("fever, cough")
+        assert after is not first and after[3] == "swapped"
+        assert after[:3] == first[:3]
+    finally:
+        utils.swap_engine(before.engine, before.version)
@@ -0,0 +1,25 @@
+import numpy as np
+import pandas as pd
+import pytest
+from training.data_prep import _read_csv_sparse, _to_uint8
+
+
+def test_valid_values_cast_exactly():
+    frame = pd.DataFrame({"fever": [0, 1, 255], "cough": [1.0, 0.0, 2.0], "rash": ["0", "1", "3"]})
+    np.testing.assert_array_equal(_to_uint8(frame, 0), [[0, 1, 0], [1, 0, 1], [255, 2, 3]])
+
+
+@pytest.mark.parametrize("bad", [300, -1, 0.5, np.nan, "yes"])
+def test_values_the_cast_would_corrupt_are_rejected(bad):
+    frame = pd.DataFrame({"fever": [0, 1, 1], "cough": [0, bad, 1]})
+    with pytest.raises(ValueError, match=r"column 'cough' at data row 12"):
+        _to_uint8(frame, 10)
+
+
+def test_csv_is_read_in_chunks_into_csr(tmp_path):
+    path = tmp_path / "symptoms.csv"
+    path.write_text("diseases,Fever,Cough\nflu,1,0\ncold,0,1\nflu,1,1\n")
+    X, diseases, symptom_cols = _read_csv_sparse(path, chunksize=2)
+    assert X.format == "csr" and X.dtype == np.uint8
+    np.testing.assert_array_equal(X.toarray(), [[1, 0], [0, 1], [1, 1]])
+    assert list(diseases) == ["flu", "cold", "flu"] and symptom_cols == ["fever", "cough"]
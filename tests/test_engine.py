@@ -0,0 +1,39 @@
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import MultiLabelBinarizer
+from app.engine import LinearEngine
+from tests.conftest import CLASSES, FEATURES, fitted_ovr, training_data
+
+
+def test_ovr_matches_sklearn_predict_proba():
+    clf, mlb, X = fitted_ovr()
+    engine = LinearEngine.from_sklearn(clf, mlb, FEATURES)
+    np.testing.assert_allclose(engine.predict_proba_matrix(X.astype(float)), clf.predict_proba(X), atol=1e-12)
+
+
+def test_multinomial_matches_sklearn_predict_proba():
+    X, y = training_data()
+    mlb = MultiLabelBinarizer(classes=CLASSES).fit([CLASSES])
+    clf = LogisticRegression(max_iter=500).fit(X, y)
+    engine = LinearEngine.from_sklearn(clf, mlb, FEATURES)
+    np.testing.assert_allclose(engine.predict_proba_matrix(X.astype(float)), clf.predict_proba(X), atol=1e-12)
+
+
+def test_single_row_and_batch_paths_agree():
+    clf, mlb, _ = fitted_ovr()
+    engine = LinearEngine.from_sklearn(clf, mlb, FEATURES)
+    lists = [["fever", "rash"], ["cough"], [], ["unknown symptom", "headache"]]
+    batch = engine.predict_proba_batch(lists)
+    for row, symptoms in zip(batch, lists):
+        np.testing.assert_allclose(row, engine.predict_proba(symptoms), atol=1e-12)
+
+
+def test_save_load_roundtrip_with_mmap(tmp_path):
+    clf, mlb, X = fitted_ovr()
+    engine = LinearEngine.from_sklearn(clf, mlb, FEATURES)
+    engine.save(tmp_path / "bundle")
+    loaded = LinearEngine.load(tmp_path / "bundle", mmap_mode="r")
+    assert loaded.feature_names == FEATURES
+    assert [str(c) for c in loaded.classes] == CLASSES
+    np.testing.assert_array_equal(loaded.predict_proba_matrix(X.astype(float)),
+                                  engine.predict_proba_matrix(X.astype(float)))
@@ -0,0 +1,36 @@
+import datetime
+import json
+from tests.conftest import add_history_rows
+
+
+def _all_pages(client, headers, limit):
+    ids, cursor = [], None
+    while True:
+        query = f"/history?limit={limit}" + (f"&cursor={cursor}" if cursor else "")
+        page = client.get(query, headers=headers).json
+        ids += [e["id"] for e in page["history"]]
+        cursor = page["next_cursor"]
+        if not cursor:
+            return ids
+
+
+def test_keyset_pagination_visits_every_row_once_newest_first(client, user):
+    uid, headers = user
+    base = datetime.datetime(2026, 3, 1)
+    # Several rows share a timestamp, so the id tie-breaker matters
+    created = [base + datetime.timedelta(minutes=i // 3) for i in range(10)]
+    ids = add_history_rows(uid, created)
+    expected = [i for _, i in sorted(zip(created, ids), reverse=True)]
+
+    for limit in (1, 3, 4, 100):
+        assert _all_pages(client, headers, limit) == expected
+    streamed = client.get("/history?stream=1", headers=headers).get_data(as_text=True).splitlines()
+    assert [json.loads(line)["id"] for line in streamed] == expected
+
+
+def test_history_is_private_and_cursor_is_validated(client, user):
+    uid, headers = user
+    add_history_rows(uid + 10_000, [datetime.datetime(2026, 1, 1)])
+    assert client.get("/history", headers=headers).json["history"] == []
+    assert client.get("/history").status_code == 401
+    assert client.get("/history?cursor=not-a-cursor", headers=headers).status_code == 400
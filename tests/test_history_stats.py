@@ -0,0 +1,81 @@
+import datetime
+from collections import Counter
+from app.db import SessionLocal, UserDailyCount
+from app.history_writer import history_writer
+from app import history_stats
+
+DAY1 = datetime.datetime(2026, 5, 1, 9)
+DAY2 = datetime.datetime(2026, 5, 2, 9)
+
+
+def _stored_counts(user_id):
+    session = SessionLocal()
+    try:
+        return Counter({(r.user_id, r.day, r.kind, r.name): r.count
+                        for r in session.query(UserDailyCount).filter_by(user_id=user_id)})
+    finally:
+        session.close()
+
+
+def _record(user_id, at, diseases, meds, doctors):
+    return {"user_id": user_id, "created_at": at, "symptoms": "s",
+            "predictions": [(d, 50.0) for d in diseases], "medications": meds,
+            "doctor_types": doctors}
+
+
+def test_count_rows_counts_each_name_once_per_row():
+    counts = history_stats.count_rows([
+        _record(1, DAY1, ["flu", "flu"], ["Rest"], '["General Physician"]'),
+        _record(None, DAY1, ["flu"], [], None),
+    ])
+    assert counts == Counter({(1, DAY1.date(), "total", ""): 1, (1, DAY1.date(), "disease", "flu"): 1,
+                              (1, DAY1.date(), "medication", "Rest"): 1,
+                              (1, DAY1.date(), "doctor", "General Physician"): 1})
+
+
+def test_apply_counts_accumulates_across_batches(user):
+    uid, _ = user
+    batch = history_stats.count_rows([_record(uid, DAY1, ["flu"], ["Rest"], [])])
+    for _ in range(3):
+        session = SessionLocal()
+        history_stats.apply_counts(session, batch)
+        session.commit()
+        session.close()
+    assert _stored_counts(uid) == Counter({key: 3 * n for key, n in batch.items()})
+
+
+def test_writer_counters_match_rebuild_and_stats_endpoint(client, user):
+    uid, headers = user
+    history_writer.submit(**_record(uid, DAY1, ["flu", "cold"], ["Rest"], '["General Physician"]'))
+    history_writer.submit(**_record(uid, DAY1, ["flu"], ["Rest", "Zinc"], '["ENT Specialist"]'))
+    history_writer.submit(**_record(uid, DAY2, ["migraine"], [], '[]'))
+    history_writer.flush()
+    incremental = _stored_counts(uid)
+
+    history_stats.rebuild(SessionLocal, user_id=uid)
+    assert _stored_counts(uid) == incremental
+
+    stats = client.get("/history/stats", headers=headers).json
+    assert stats["total_predictions"] == 3
+    assert stats["top_diseases"][0] == {"name": "flu", "count": 2}
+    assert stats["unique_medications"] == 2
+    day1 = client.get("/history/stats?from=2026-05-01&to=2026-05-01", headers=headers).json
+    assert day1["total_predictions"] == 2 and {d["name"] for d in day1["top_diseases"]} == {"flu", "cold"}
+    assert client.get("/history/stats?from=May", headers=headers).status_code == 400
+
+
+def test_init_db_counts_existing_history_once(user):
+    from app.db import init_db
+    uid, _ = user
+    history_writer.submit(**_record(uid, DAY1, ["flu"], ["Rest"], '[]'))
+    history_writer.flush()
+    expected = _stored_counts(uid)
+
+    session = SessionLocal()
+    session.query(UserDailyCount).delete()
+    session.commit()
+    session.close()
+    init_db()
+    assert _stored_counts(uid) == expected
+    init_db()
+    assert _stored_counts(uid) == expected
@@ -0,0 +1,43 @@
+import datetime
+from app.db import SessionLocal, History
+from app.history_writer import HistoryWriter, ROWS_DROPPED
+
+
+def _dropped():
+    return ROWS_DROPPED._values.get((), 0)
+
+
+def test_one_bad_row_does_not_drop_its_batch():
+    writer = HistoryWriter(SessionLocal)
+    created = datetime.datetime(2034, 1, 1)
+    good = {"symptoms": "writer test", "created_at": created, "predictions": [("flu", 50.0)], "medications": []}
+    before = _dropped()
+
+    writer._write([good, dict(good, not_a_column=1), good])
+
+    session = SessionLocal()
+    try:
+        assert session.query(History).filter(History.created_at == created).count() == 2
+    finally:
+        session.close()
+    assert _dropped() == before + 1
+
+
+def test_a_transient_failure_is_retried(monkeypatch):
+    writer = HistoryWriter(SessionLocal)
+    created = datetime.datetime(2034, 2, 1)
+    calls = []
+    real_commit = writer._commit
+
+    def flaky(batch):
+        calls.append(len(batch))
+        return len(calls) > 1 and real_commit(batch)
+    monkeypatch.setattr(writer, "_commit", flaky)
+
+    writer._write([{"symptoms": "retry", "created_at": created}] * 3)
+    assert calls == [3, 3]
+    session = SessionLocal()
+    try:
+        assert session.query(History).filter(History.created_at == created).count() == 3
+    finally:
+        session.close()
@@ -0,0 +1,100 @@
+import datetime
+import os
+import pytest
+from app.db import SessionLocal, History
+from training import incremental
+from tests.conftest import CLASSES, FEATURES, training_data
+
+FEATURE_INDEX = {name: i for i, name in enumerate(FEATURES)}
+CLASS_INDEX = {name: i for i, name in enumerate(CLASSES)}
+
+
+def _add(symptoms, created_at, disease=None, confirmed_at=None):
+    session = SessionLocal()
+    try:
+        h = History(symptoms=symptoms, created_at=created_at, confirmed_disease=disease, confirmed_at=confirmed_at)
+        session.add(h)
+        session.commit()
+        return h.id
+    finally:
+        session.close()
+
+
+def _confirm(history_id, disease, at):
+    session = SessionLocal()
+    try:
+        h = session.get(History, history_id)
+        h.confirmed_disease, h.confirmed_at = disease, at
+        session.commit()
+    finally:
+        session.close()
+
+
+def _consume(last):
+    """(labels, last) from every batch after last."""
+    labels = []
+    for _, y, last, _ in incremental._labelled_batches(last, FEATURE_INDEX, CLASS_INDEX):
+        labels += [CLASSES[i] for i in y]
+    return labels, last
+
+
+def test_resumes_on_confirmation_time_not_row_id():
+    t0 = datetime.datetime(2030, 1, 1)
+    start = (t0, 0)
+    old = _add("fever, cough", created_at=t0)
+    new = _add("headache", created_at=t0 + datetime.timedelta(hours=1),
+               disease="migraine", confirmed_at=t0 + datetime.timedelta(hours=2))
+
+    labels, last = _consume(start)
+    assert labels == ["migraine"] and last[1] == new
+
+    # An older row confirmed after the checkpoint is still learned
+    _confirm(old, "flu", t0 + datetime.timedelta(hours=3))
+    labels, last = _consume(last)
+    assert labels == ["flu"] and last[1] == old
+    assert _consume(last) == ([], last)
+
+    # So is a changed diagnosis on a row already consumed
+    _confirm(new, "cold", t0 + datetime.timedelta(hours=4))
+    labels, last = _consume(last)
+    assert labels == ["cold"] and last[1] == new
+
+
+def test_unknown_diseases_are_skipped_but_consumed():
+    t0 = datetime.datetime(2031, 1, 1)
+    _add("rash", created_at=t0, disease="not a class", confirmed_at=t0 + datetime.timedelta(minutes=1))
+    batches = list(incremental._labelled_batches((t0, 0), FEATURE_INDEX, CLASS_INDEX))
+    assert [(len(y), skipped) for _, y, _, skipped in batches] == [(0, 1)]
+
+
+def _checkpoint():
+    X, y = training_data()
+    model = incremental._new_model()
+    model.partial_fit(X, y, classes=list(range(len(CLASSES))))
+    return {"model": model, "classes": CLASSES, "feature_names": FEATURES, "last_confirmed": None, "rows_seen": 0}
+
+
+def test_checkpoint_is_saved_only_after_publishing(monkeypatch):
+    t0 = datetime.datetime(2033, 1, 1)
+    _add("fever, cough", created_at=t0, disease="flu", confirmed_at=t0)
+    saved = []
+    monkeypatch.setattr(incremental, "load_checkpoint", _checkpoint)
+    monkeypatch.setattr(incremental, "save_checkpoint", saved.append)
+
+    def broken_publish(*args, **kwargs):
+        raise OSError("disk full")
+    monkeypatch.setattr(incremental.registry, "publish", broken_publish)
+    with pytest.raises(OSError):
+        incremental.update_model()
+    assert saved == []
+
+    monkeypatch.setattr(incremental.registry, "publish", lambda engine, version, activate: version)
+    version = incremental.update_model()
+    assert version and saved[0]["last_confirmed"][0] >= t0
+
+
+def test_new_version_does_not_reuse_a_name(monkeypatch):
+    monkeypatch.setattr(incremental.time, "strftime", lambda fmt, t=None: "20300101-000000-inc")
+    taken = {"20300101-000000-inc", "20300101-000000-inc2"}
+    monkeypatch.setattr(incremental.os.path, "exists", lambda path: os.path.basename(path) in taken)
+    assert incremental._new_version() == "20300101-000000-inc3"
@@ -0,0 +1,45 @@
+from app.metrics import REQUEST_SECONDS, Counter, Histogram, REGISTRY
+
+
+def _count(labels):
+    entry = REQUEST_SECONDS._values.get(labels)
+    return sum(entry[0]) if entry else 0
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("test_seconds", "Test.", ["stage"], buckets=(0.1, 1.0))
+    REGISTRY.remove(histogram)
+    for value in (0.05, 0.5, 0.5, 3.0):
+        histogram.observe(value, "x")
+    assert histogram.render()[2:] == [
+        'test_seconds_bucket{stage="x",le="0.1"} 1',
+        'test_seconds_bucket{stage="x",le="1.0"} 3',
+        'test_seconds_bucket{stage="x",le="+Inf"} 4',
+        'test_seconds_sum{stage="x"} 4.05',
+        'test_seconds_count{stage="x"} 4',
+    ]
+
+
+def test_counter_without_labels():
+    counter = Counter("test_total", "Test.")
+    REGISTRY.remove(counter)
+    counter.inc()
+    counter.inc(amount=2)
+    assert counter.render()[2:] == ["test_total 3"]
+
+
+def test_metrics_endpoint_reports_stages_and_requests(client):
+    client.post("/predict", json={"symptoms": "fever"})
+    body = client.get("/metrics").get_data(as_text=True)
+    assert 'curesense_stage_seconds_count{stage="predict_proba"}' in body
+    assert 'curesense_requests_total{endpoint="predict",status="200"}' in body
+    assert "curesense_worker_pid " in body
+
+
+def test_streamed_responses_are_timed_when_they_finish(client):
+    before = _count(("predict_batch",))
+    response = client.post("/predict/batch", json=["fever", "cough"], buffered=False)
+    assert _count(("predict_batch",)) == before
+    response.get_data()
+    response.close()
+    assert _count(("predict_batch",)) == before + 1
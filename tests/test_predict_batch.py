@@ -0,0 +1,43 @@
+import json
+from app import app as app_module
+from tests.conftest import CLASSES
+
+
+def _rows(response):
+    assert response.status_code == 200
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def test_rows_keep_their_order_ids_and_errors(client, monkeypatch):
+    monkeypatch.setattr(app_module, "BATCH_CHUNK_SIZE", 2)
+    records = [{"id": "a", "symptoms": "fever, rash"}, {"id": "b", "symptoms": ""}, "cough",
+               {"request_id": 7, "symptoms": 5}, "headache, nausea"]
+    rows = _rows(client.post("/predict/batch", json=records))
+
+    assert [r["index"] for r in rows] == list(range(5))
+    assert [r.get("id") for r in rows] == ["a", "b", None, 7, None]
+    assert [r.get("error") for r in rows] == [None, "No symptoms provided", None, "No symptoms provided", None]
+    for row in (rows[0], rows[2], rows[4]):
+        single = client.post("/predict", json={"symptoms": row["symptoms"]}).json
+        assert row["predicted_diseases"] == single["predicted_diseases"]
+        assert row["medications"] == single["medications"]
+
+
+def test_ndjson_bad_lines_become_error_rows(client):
+    body = '{"symptoms": "fever"}\nnot json\n\n"cough"\n'
+    rows = _rows(client.post("/predict/batch", data=body, content_type="application/x-ndjson"))
+    assert [r["index"] for r in rows] == [0, 1, 2]
+    assert "error" not in rows[0] and rows[1]["error"].startswith("Invalid JSON line") and "error" not in rows[2]
+
+
+def test_top_k_is_clamped(client):
+    for top_k, expected in (("-1", 1), ("0", 1), ("2", 2), ("1000", len(CLASSES))):
+        rows = _rows(client.post(f"/predict/batch?top_k={top_k}", json=["fever, cough"]))
+        assert len(rows[0]["predicted_diseases"]) == expected
+
+
+def test_a_body_that_is_not_a_list_is_rejected_up_front(client):
+    for body in ({"symptoms": "fever"}, "fever", 3):
+        response = client.post("/predict/batch", json=body)
+        assert response.status_code == 400 and "error" in response.json
+    assert _rows(client.post("/predict/batch", json={"records": ["fever"]}))[0]["index"] == 0
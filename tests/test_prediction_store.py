@@ -0,0 +1,71 @@
+import datetime
+import json
+from app.db import SessionLocal, History
+from app.history_writer import history_writer
+from app import prediction_store
+from tests.conftest import add_history_rows
+
+
+def _add_legacy_rows(user_id, entries):
+    session = SessionLocal()
+    try:
+        rows = [History(user_id=user_id, symptoms="legacy", predicted_diseases=json.dumps(diseases),
+                        medications=json.dumps(meds), created_at=datetime.datetime(2025, 1, 1 + i))
+                for i, (diseases, meds) in enumerate(entries)]
+        session.add_all(rows)
+        session.commit()
+        return [r.id for r in rows]
+    finally:
+        session.close()
+
+
+def test_predict_is_recorded_with_confidences(client, user):
+    _, headers = user
+    response = client.post("/predict", json={"symptoms": "fever, rash"}, headers=headers).json
+    history_writer.flush()
+    entry = client.get("/history", headers=headers).json["history"][0]
+    assert entry["predicted_diseases"] == [d for d, _ in response["predicted_diseases"]]
+    assert entry["confidences"] == [c for _, c in response["predicted_diseases"]]
+    assert entry["medications"] == response["medications"]
+
+
+def test_legacy_rows_read_the_same_before_and_after_migration(client, user):
+    uid, headers = user
+    _add_legacy_rows(uid, [(["flu", "cold"], ["Rest"]), ([], []), (["migraine"], ["Rest", "Rest", "Ibuprofen"])])
+    before = client.get("/history", headers=headers).json["history"]
+    assert all(e["confidences"] is None for e in before)
+
+    prediction_store.migrate(SessionLocal, batch_size=2)
+    assert prediction_store.migrate(SessionLocal) == 0
+    after = client.get("/history", headers=headers).json["history"]
+    assert after == [
+        dict(e, medications=list(dict.fromkeys(e["medications"]))) for e in before
+    ]
+
+
+def test_histories_predicting_uses_the_time_window(user):
+    uid, _ = user
+    now = datetime.datetime.utcnow()
+    recent, old = add_history_rows(uid, [now, now - datetime.timedelta(days=30)])
+    session = SessionLocal()
+    try:
+        week_ago = now - datetime.timedelta(days=7)
+        ids = {h.id for h in prediction_store.histories_predicting(session, "flu", week_ago)}
+        assert recent in ids and old not in ids
+        assert prediction_store.histories_predicting(session, "no such disease").count() == 0
+    finally:
+        session.close()
+
+
+def test_admin_predictions_validates_days(client, user, monkeypatch):
+    from app import app as app_module
+    monkeypatch.setattr(app_module, "ADMIN_TOKEN", "admin-secret")
+    headers = {"X-Admin-Token": "admin-secret"}
+    uid, _ = user
+    add_history_rows(uid, [datetime.datetime.utcnow()])
+
+    for days in ("1e10", "-1", "0", "nan", "inf", "soon"):
+        response = client.get(f"/admin/predictions?disease=flu&days={days}", headers=headers)
+        assert response.status_code == 400, days
+    response = client.get("/admin/predictions?disease=flu&days=0.5", headers=headers)
+    assert response.status_code == 200 and response.json["count"] >= 1
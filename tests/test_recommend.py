@@ -0,0 +1,43 @@
+from app import utils
+from app.recommend import RecommendationTable
+
+DISEASES = ["flu", "Common Cold", " migraine ", "eye strain", "inner ear infection", "sore throat",
+            "skin rash", "stomach ache", "respiratory infection", "fever of unknown origin",
+            "earache and eye pain", "measles", "something new", "anemia"]
+
+
+def _old_recommend(diseases):
+    """The per-request loop RecommendationTable replaced."""
+    meds, docs = set(), set()
+    for d in diseases:
+        disease = d.lower().strip()
+        if disease in utils.DISEASE_MED_MAP:
+            info = utils.DISEASE_MED_MAP[disease]
+            meds.update(info["meds"])
+            docs.update(info["doctors"])
+            continue
+        for key, info in utils.DEFAULT_CATEGORY_MAP.items():
+            if key in disease:
+                meds.update(info["meds"])
+                docs.update(info["doctors"])
+                break
+        if not any(key in disease for key in utils.DEFAULT_CATEGORY_MAP.keys()):
+            meds.update(["Consult Doctor", "Hydration", "Rest"])
+            docs.update(["General Physician"])
+    return sorted(meds), sorted(docs)
+
+
+def test_matches_the_old_loop_for_classes_and_other_names():
+    # Half the names are model classes (precomputed), the rest go through the fallback path
+    table = RecommendationTable(DISEASES[::2], utils.DISEASE_MED_MAP, utils.DEFAULT_CATEGORY_MAP)
+    for d in DISEASES:
+        assert table.lookup([d]) == _old_recommend([d]), d
+    for combo in (DISEASES[:3], DISEASES[3:8], DISEASES[8:], DISEASES, []):
+        assert table.lookup(combo) == _old_recommend(combo)
+    # The memoised fallback answers the same the second time
+    assert table.lookup(DISEASES) == _old_recommend(DISEASES)
+
+
+def test_served_model_uses_the_table():
+    diseases = [("flu", 60.0), ("measles", 20.0)]
+    assert utils.recommend_for_diseases(diseases) == _old_recommend(["flu", "measles"])
@@ -0,0 +1,59 @@
+import json
+import os
+import shutil
+import pytest
+from app import registry, utils
+
+
+@pytest.fixture
+def admin(monkeypatch):
+    from app import app as app_module
+    monkeypatch.setattr(app_module, "ADMIN_TOKEN", "admin-secret")
+    return {"X-Admin-Token": "admin-secret"}
+
+
+@pytest.fixture
+def registry_dir(monkeypatch):
+    """The (temporary, see conftest) registry, served from for this test and emptied afterwards."""
+    previous = utils.state
+    monkeypatch.setattr(utils, "MODEL_FORMAT", "registry")
+    yield registry.REGISTRY_DIR
+    shutil.rmtree(registry.REGISTRY_DIR, ignore_errors=True)
+    utils.swap_engine(previous.engine, previous.version)
+
+
+def test_publish_and_current(registry_dir):
+    assert registry.current_version() is None
+    registry.publish(utils.state.engine, "v1")
+    registry.publish(utils.state.engine, "v2", activate=False)
+    assert registry.list_versions() == ["v1", "v2"]
+    assert registry.current_version() == "v1"
+    with pytest.raises(ValueError):
+        registry.publish(utils.state.engine, "v1")
+
+
+def test_reload_never_publishes_a_broken_version(client, admin, registry_dir):
+    registry.publish(utils.state.engine, "good")
+    broken = os.path.join(registry_dir, "broken")
+    os.makedirs(broken)
+    with open(os.path.join(broken, "meta.json"), "w") as f:
+        json.dump({}, f)
+
+    assert client.post("/admin/reload", json={"version": "broken"}, headers=admin).status_code == 400
+    assert client.post("/admin/reload", json={"version": 3}, headers=admin).status_code == 400
+    assert registry.current_version() == "good"
+
+    response = client.post("/admin/reload", json={"version": "good"}, headers=admin)
+    assert response.status_code == 200 and response.json["model_version"] == "good"
+    assert client.post("/admin/reload", json={}, headers={"X-Admin-Token": "wrong"}).status_code == 403
+
+
+def test_reload_rejects_non_objects_and_unknown_names(client, admin, registry_dir, monkeypatch):
+    registry.publish(utils.state.engine, "good")
+    loaded = []
+    monkeypatch.setattr("app.app.load_model", loaded.append)
+    for body in ([], ["good"], "good"):
+        assert client.post("/admin/reload", json=body, headers=admin).status_code == 400
+    for version in ("../model_bundle", "missing", registry_dir):
+        assert client.post("/admin/reload", json={"version": version}, headers=admin).status_code == 400
+    assert loaded == []
@@ -0,0 +1,25 @@
+import os
+import sys
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ui"))
+from history_stats import HistoryStats  # noqa: E402
+
+ROWS = [
+    {"Date & Time": "1", "Symptoms": "a", "Predicted Diseases": "Flu, Cold", "Medications": "Rest",
+     "Suggested Doctors": "General Physician"},
+    {"Date & Time": "2", "Symptoms": "b", "Predicted Diseases": "", "Medications": "None",
+     "Suggested Doctors": "ENT Specialist"},
+    {"Date & Time": "3", "Symptoms": "c", "Predicted Diseases": "Flu", "Medications": "",
+     "Suggested Doctors": ""},
+]
+
+
+def test_running_counts_match_a_full_recompute():
+    running = HistoryStats().update(ROWS[:1]).update(ROWS[1:])
+    full = HistoryStats.from_frame(pd.DataFrame(ROWS))
+    assert running.total == full.total == 3
+    assert running.counts == full.counts
+    # Blank cells are missing, not the previous row's value
+    assert full.counts["Predicted Diseases"] == {"Flu": 2, "Cold": 1, "Unknown": 1}
+    assert full.counts["Suggested Doctors"]["Unknown"] == 1
@@ -0,0 +1,32 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ui"))
+from history_store import append_entry, read_since  # noqa: E402
+
+ROWS = [
+    {"Date & Time": "1", "Symptoms": "a", "Predicted Diseases": "Flu, Cold", "Medications": "Rest",
+     "Suggested Doctors": "General Physician"},
+    {"Date & Time": "2", "Symptoms": "b", "Predicted Diseases": "", "Medications": "None",
+     "Suggested Doctors": "ENT Specialist"},
+    {"Date & Time": "3", "Symptoms": "c", "Predicted Diseases": "Flu", "Medications": "",
+     "Suggested Doctors": ""},
+]
+
+
+def test_read_since_returns_only_new_complete_rows(tmp_path):
+    path = str(tmp_path / "history.csv")
+    append_entry(path, ROWS[0])
+    records, offset, columns = read_since(path)
+    assert records == [ROWS[0]]
+
+    append_entry(path, ROWS[1])
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("4,partial")
+    records, offset, columns = read_since(path, offset, columns)
+    assert records == [ROWS[1]]
+    assert read_since(path, offset, columns)[0] == []
+
+    os.remove(path)
+    append_entry(path, ROWS[2])
+    assert read_since(path, offset, columns)[0] == [ROWS[2]]
@@ -0,0 +1,59 @@
+import argparse
+import os
+import statistics
+import threading
+import time
+import requests
+from werkzeug.serving import make_server
+from ui import api_client
+
+
+def _serve(port):
+    from app.app import app
+    server = make_server("127.0.0.1", port, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _time_calls(call, n):
+    latencies = []
+    for _ in range(n):
+        start = time.perf_counter()
+        response = call()
+        response.raise_for_status()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return {"mean_ms": round(statistics.mean(latencies), 3), "p50_ms": round(statistics.median(latencies), 3)}
+
+
+def compare_clients(base, n=200):
+    """
+    Per-action latency of the UI's old client (a new connection per
+    requests.post) against the pooled api_client session, for a /predict
+    call. Over TLS, each reused connection saves a TCP and a TLS handshake.
+    """
+    body = {"symptoms": "fever, cough, headache"}
+    fresh = _time_calls(lambda: requests.post(f"{base}/predict", json=body, timeout=15), n)
+    session = api_client.make_session()
+    api_client.post(session, "/predict", body, base=base)
+    pooled = _time_calls(lambda: api_client.post(session, "/predict", body, base=base), n)
+    return {"base": base, "requests": n, "new_connection": fresh, "pooled": pooled,
+            "saved_ms_per_action": round(fresh["mean_ms"] - pooled["mean_ms"], 3)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure latency saved by reusing HTTP connections in the UI client.")
+    parser.add_argument("--url", help="backend to call (default: start the app locally)")
+    parser.add_argument("-n", type=int, default=200)
+    parser.add_argument("--port", type=int, default=int(os.environ.get("CURESENSE_BENCH_PORT", 5098)))
+    args = parser.parse_args()
+
+    server = None if args.url else _serve(args.port)
+    try:
+        r = compare_clients(args.url or f"http://127.0.0.1:{args.port}", args.n)
+    finally:
+        if server:
+            server.shutdown()
+    print(f"📊 {r['requests']} POST /predict calls to {r['base']}:")
+    print(f"  new connection each   mean {r['new_connection']['mean_ms']:8.2f} ms   p50 {r['new_connection']['p50_ms']:8.2f} ms")
+    print(f"  pooled session        mean {r['pooled']['mean_ms']:8.2f} ms   p50 {r['pooled']['p50_ms']:8.2f} ms")
+    print(f"  saved per action      {r['saved_ms_per_action']:.2f} ms")
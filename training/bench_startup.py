@@ -0,0 +1,49 @@
+import json
+import os
+import subprocess
+import sys
+
+# Runs in a fresh interpreter so imports and RSS start from zero.
+PROBE = """
+import json, resource, sys, time
+t0 = time.perf_counter()
+import app.utils as utils
+t1 = time.perf_counter()
+utils.predict_diseases("fever, cough")
+t2 = time.perf_counter()
+print(json.dumps({
+    "import_s": round(t1 - t0, 4),
+    "first_predict_ms": round((t2 - t1) * 1000, 3),
+    "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    "pandas_loaded": "pandas" in sys.modules,
+    "sklearn_loaded": "sklearn" in sys.modules,
+}))
+"""
+
+
+def measure(model_format, runs=5):
+    """Best-of-N cold start of app.utils with the given CURESENSE_MODEL_FORMAT."""
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, CURESENSE_MODEL_FORMAT=model_format, PYTHONWARNINGS="ignore")
+    results = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", PROBE], cwd=base_dir, env=env,
+                             capture_output=True, text=True, check=True).stdout
+        results.append(json.loads(out.strip().splitlines()[-1]))
+    best = min(results, key=lambda r: r["import_s"])
+    best["max_rss_mb"] = min(r["max_rss_mb"] for r in results)
+    return best
+
+
+def compare_startup():
+    """Print cold-start time and peak RSS for the pickle and .npy bundle artifacts."""
+    report = {fmt: measure(fmt) for fmt in ("pickle", "bundle")}
+    print("📊 Cold start (best of 5):")
+    for fmt, r in report.items():
+        print(f"  {fmt:<7} import {r['import_s'] * 1000:8.1f} ms   first predict {r['first_predict_ms']:7.3f} ms   "
+              f"RSS {r['max_rss_mb']:7.1f} MB   pandas={r['pandas_loaded']} sklearn={r['sklearn_loaded']}")
+    return report
+
+
+if __name__ == "__main__":
+    compare_startup()
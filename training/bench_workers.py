@@ -0,0 +1,87 @@
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.request
+
+
+def _mem_kb(pid):
+    """(rss, pss) of one process in KiB from /proc (Linux only)."""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in ("Rss", "Pss"):
+                values[key] = int(rest.split()[0])
+    return values.get("Rss", 0), values.get("Pss", 0)
+
+
+def _children(pid):
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        return [int(p) for p in f.read().split()]
+
+
+def measure(workers, mmap=True, preload=True, port=5099, requests=200):
+    """Start gunicorn with N workers, warm every worker, and report per-worker memory."""
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, WEB_CONCURRENCY=str(workers), CURESENSE_BIND=f"127.0.0.1:{port}",
+               CURESENSE_MODEL_MMAP="1" if mmap else "0", CURESENSE_PRELOAD="1" if preload else "0",
+               PYTHONWARNINGS="ignore")
+    proc = subprocess.Popen([sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app.app:app"],
+                            cwd=base_dir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        url = f"http://127.0.0.1:{port}"
+        deadline = time.time() + 120
+        while True:
+            try:
+                urllib.request.urlopen(f"{url}/health", timeout=1).read()
+                if len(_children(proc.pid)) >= workers:
+                    break
+            except OSError:
+                pass
+            if time.time() > deadline:
+                raise RuntimeError("gunicorn did not start")
+            time.sleep(0.2)
+
+        body = json.dumps({"symptoms": "fever, cough, headache"}).encode()
+        for _ in range(requests * workers):
+            req = urllib.request.Request(f"{url}/predict", data=body, headers={"Content-Type": "application/json"})
+            urllib.request.urlopen(req, timeout=10).read()
+
+        mem = [_mem_kb(pid) for pid in _children(proc.pid)]
+        return {
+            "workers": workers,
+            "mmap": mmap,
+            "preload": preload,
+            "rss_per_worker_mb": round(sum(r for r, _ in mem) / len(mem) / 1024, 1),
+            "pss_per_worker_mb": round(sum(p for _, p in mem) / len(mem) / 1024, 1),
+            "pss_total_mb": round((sum(p for _, p in mem) + _mem_kb(proc.pid)[1]) / 1024, 1),
+        }
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        proc.wait()
+
+
+def compare_workers(counts=(1, 4, 16)):
+    """
+    Per-worker RSS/PSS for each worker count, with the bundle memory-mapped
+    and preloaded versus loaded separately in every worker. PSS divides
+    shared pages between the processes mapping them, so it is the number
+    that should stay flat as workers are added.
+    """
+    report = []
+    for mmap, preload in ((True, True), (False, False)):
+        for n in counts:
+            r = measure(n, mmap=mmap, preload=preload)
+            report.append(r)
+            print(f"  workers={r['workers']:<3} mmap={str(mmap):<5} preload={str(preload):<5} "
+                  f"RSS/worker {r['rss_per_worker_mb']:7.1f} MB   PSS/worker {r['pss_per_worker_mb']:7.1f} MB   "
+                  f"PSS total {r['pss_total_mb']:8.1f} MB")
+    return report
+
+
+if __name__ == "__main__":
+    print("📊 gunicorn worker memory:")
+    compare_workers()
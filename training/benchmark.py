@@ -0,0 +1,155 @@
+import argparse
+import datetime
+import json
+import os
+import sys
+import tempfile
+import time
+import joblib
+import numpy as np
+from sklearn.metrics import classification_report, f1_score
+from app.engine import LinearEngine
+from training.data_prep import load_and_preprocess
+from training.train_model import build_classifier, fit_classifier, predict_indicator
+
+DEFAULT_CONFIGS = [
+    {"name": "ovr-liblinear", "mode": "ovr", "n_jobs": -1},
+    {"name": "multinomial-lbfgs", "mode": "multinomial"},
+]
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Git-ignored home for generated reports
+REPORT_DIR = os.path.join(BASE_DIR, "benchmarks")
+# Latency is measured on at most this many test rows, batch throughput on all of them
+LATENCY_ROWS = 2000
+BATCH_CHUNK_SIZE = 512
+
+
+def _dir_size(path):
+    return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+
+
+def _row_texts(X, symptom_cols):
+    """Rebuild the comma-separated symptom text the API would receive for each row."""
+    return [", ".join(symptom_cols[j] for j in X[i].indices) for i in range(X.shape[0])]
+
+
+def benchmark_config(config, data, load_runs=5):
+    """Train one candidate and measure accuracy, serving latency, throughput, size and load time."""
+    from app import utils
+
+    (X_train, X_test, Y_train, Y_test), mlb, symptom_cols = data
+    params = {k: v for k, v in config.items() if k not in ("name", "mode", "n_jobs")}
+    clf = build_classifier(config.get("mode", "ovr"), config.get("n_jobs", -1), **params)
+    start = time.perf_counter()
+    fit_classifier(clf, X_train, Y_train)
+    fit_s = time.perf_counter() - start
+
+    preds = predict_indicator(clf, X_test, len(mlb.classes_))
+    result = {
+        "name": config["name"],
+        "config": config,
+        "fit_seconds": round(fit_s, 3),
+        "f1_micro": round(float(f1_score(Y_test, preds, average="micro")), 4),
+        "per_class": classification_report(Y_test, preds, target_names=list(mlb.classes_),
+                                           output_dict=True, zero_division=0),
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        bundle_dir = os.path.join(tmp, "bundle")
+        LinearEngine.from_sklearn(clf, mlb, symptom_cols).save(bundle_dir)
+        joblib.dump(clf, os.path.join(tmp, "model.pkl"))
+        result["bundle_bytes"] = _dir_size(bundle_dir)
+        result["pickle_bytes"] = os.path.getsize(os.path.join(tmp, "model.pkl"))
+
+        load_times = []
+        for _ in range(load_runs):
+            start = time.perf_counter()
+            engine = LinearEngine.load(bundle_dir)
+            load_times.append(time.perf_counter() - start)
+        result["load_ms"] = round(min(load_times) * 1000, 3)
+
+        # Serve the candidate through the same code path as the API
+        utils.swap_engine(engine, config["name"])
+        texts = _row_texts(X_test, symptom_cols)
+        sample = texts[:LATENCY_ROWS]
+        for t in sample[:50]:
+            utils.predict_diseases(t)
+        latencies = []
+        for t in sample:
+            start = time.perf_counter()
+            utils.predict_diseases(t)
+            latencies.append(time.perf_counter() - start)
+        result["latency_us"] = {
+            "p50": round(float(np.percentile(latencies, 50)) * 1e6, 2),
+            "p99": round(float(np.percentile(latencies, 99)) * 1e6, 2),
+        }
+
+        start = time.perf_counter()
+        for i in range(0, len(texts), BATCH_CHUNK_SIZE):
+            utils.predict_diseases_batch(texts[i:i + BATCH_CHUNK_SIZE])
+        elapsed = time.perf_counter() - start
+        result["batch_rows_per_sec"] = round(len(texts) / elapsed, 1) if elapsed else None
+
+    return result
+
+
+def check_regressions(results, baseline, max_latency_ratio):
+    """Names of candidates whose p99 latency grew more than max_latency_ratio over the baseline."""
+    previous = {r["name"]: r for r in baseline.get("results", [])}
+    failures = []
+    for r in results:
+        old = previous.get(r["name"])
+        if old and r["latency_us"]["p99"] > old["latency_us"]["p99"] * max_latency_ratio:
+            failures.append(f"{r['name']}: p99 {old['latency_us']['p99']}us -> {r['latency_us']['p99']}us")
+    return failures
+
+
+def run_benchmark(configs=DEFAULT_CONFIGS, output=None, baseline_path=None, max_latency_ratio=2.0):
+    data = load_and_preprocess()
+    results = [benchmark_config(c, data) for c in configs]
+    report = {
+        "generated_at": datetime.datetime.utcnow().isoformat(),
+        "cpu_count": os.cpu_count(),
+        "train_rows": data[0][0].shape[0],
+        "test_rows": data[0][1].shape[0],
+        "results": results,
+    }
+
+    print("\n📊 Model benchmark:")
+    print(f"  {'name':<22} {'F1':>6} {'p50 us':>8} {'p99 us':>8} {'rows/s':>10} {'bundle KiB':>11} {'load ms':>8}")
+    for r in results:
+        print(f"  {r['name']:<22} {r['f1_micro']:>6.3f} {r['latency_us']['p50']:>8.1f} {r['latency_us']['p99']:>8.1f} "
+              f"{r['batch_rows_per_sec']:>10.0f} {r['bundle_bytes'] / 1024:>11.1f} {r['load_ms']:>8.2f}")
+
+    if output:
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ Report written to: {output}")
+
+    if baseline_path:
+        with open(baseline_path) as f:
+            failures = check_regressions(results, json.load(f), max_latency_ratio)
+        if failures:
+            print(f"❌ Latency regressed more than {max_latency_ratio}x against {baseline_path}:")
+            for failure in failures:
+                print(f"   {failure}")
+            report["regressions"] = failures
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare candidate model configurations for accuracy and serving cost.")
+    parser.add_argument("--configs", help='JSON file with a list of {"name", "mode", "n_jobs", ...} objects')
+    parser.add_argument("--output", default=os.path.join(REPORT_DIR, "benchmark_report.json"),
+                        help="where to write the JSON report (default: benchmarks/benchmark_report.json)")
+    parser.add_argument("--baseline", help="previous report to compare p99 latency against")
+    parser.add_argument("--max-latency-ratio", type=float, default=2.0)
+    args = parser.parse_args()
+
+    configs = DEFAULT_CONFIGS
+    if args.configs:
+        with open(args.configs) as f:
+            configs = json.load(f)
+    report = run_benchmark(configs, args.output, args.baseline, args.max_latency_ratio)
+    sys.exit(1 if report.get("regressions") else 0)
@@ -0,0 +1,191 @@
+"""
+Offline bulk scoring.
+
+Scores a CSV (a "symptoms" column, optional "id") or JSONL file of
+{"symptoms": ..., "id"/"request_id": ...} records with the same model and
+recommendation logic as the API, without going through HTTP:
+
+    python -m training.bulk_score records.jsonl scored.jsonl --workers 8
+    python -m training.bulk_score records.csv scored.csv --chunk-size 5000
+
+Input is read and scored chunk by chunk across a process pool; each worker
+loads the model once, and results are written in input order as soon as
+each chunk finishes, so memory stays flat however large the file is.
+"""
+
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import time
+from collections import deque
+import pandas as pd
+
+CHUNK_SIZE = 2000
+# Chunks submitted to the pool but not yet written, per worker
+IN_FLIGHT_PER_WORKER = 2
+CSV_COLUMNS = ["index", "id", "symptoms", "predicted_diseases", "medications", "doctor_types", "model_version", "error"]
+
+
+def _format_of(path, explicit=None):
+    if explicit:
+        return explicit
+    ext = os.path.splitext(path)[1].lower()
+    return "csv" if ext == ".csv" else "jsonl"
+
+
+def read_chunks(path, fmt, chunk_size=CHUNK_SIZE):
+    """Yield lists of (index, record_id, symptoms, error) without reading the whole file."""
+    index = 0
+    if fmt == "csv":
+        for frame in pd.read_csv(path, chunksize=chunk_size, dtype=str, keep_default_na=False):
+            if "symptoms" not in frame.columns:
+                raise ValueError(f"{path} has no 'symptoms' column")
+            ids = frame["id"] if "id" in frame.columns else [None] * len(frame)
+            chunk = []
+            for record_id, symptoms in zip(ids, frame["symptoms"]):
+                chunk.append((index, record_id or None, symptoms, None if symptoms.strip() else "No symptoms provided"))
+                index += 1
+            yield chunk
+        return
+
+    chunk = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record_id, symptoms, error = None, None, None
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                error = f"Invalid JSON line: {e}"
+            else:
+                if isinstance(record, dict):
+                    record_id = record.get("id", record.get("request_id"))
+                    symptoms = record.get("symptoms", "")
+                else:
+                    symptoms = record
+                if not isinstance(symptoms, str) or not symptoms.strip():
+                    error = "No symptoms provided"
+            chunk.append((index, record_id, symptoms, error))
+            index += 1
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+
+def _init_worker():
+    # Importing app.utils loads the model; do it once per worker, not per chunk.
+    import app.utils  # noqa: F401
+
+
+def score_chunk(chunk, top_k=3):
+    """Score one chunk with analyze_batch; returns one output dict per input row."""
+    from app.utils import analyze_batch
+
+    valid = [row for row in chunk if row[3] is None]
+    results, model_version = analyze_batch([row[2] for row in valid], top_k) if valid else ([], None)
+    results = iter(results)
+    out = []
+    for index, record_id, symptoms, error in chunk:
+        row = {"index": index}
+        if record_id is not None:
+            row["id"] = record_id
+        if error is not None:
+            row["error"] = error
+        else:
+            disease_confidences, meds, docs = next(results)
+            row.update({
+                "symptoms": symptoms,
+                "predicted_diseases": disease_confidences,
+                "medications": meds,
+                "doctor_types": docs,
+                "model_version": model_version
+            })
+        out.append(row)
+    return out
+
+
+def _score_packed(args):
+    return score_chunk(*args)
+
+
+def _scored_in_order(pool, chunks, window):
+    """
+    Like pool.imap, but reads the next input chunk only once a slot frees up,
+    so at most `window` chunks are read, scoring or waiting to be written.
+    (imap drains the whole input iterator up front.)
+    """
+    pending = deque()
+    for chunk in chunks:
+        pending.append(pool.apply_async(_score_packed, (chunk,)))
+        if len(pending) >= window:
+            yield pending.popleft().get()
+    while pending:
+        yield pending.popleft().get()
+
+
+class _Writer:
+    def __init__(self, f, fmt):
+        self.f, self.fmt = f, fmt
+        if fmt == "csv":
+            self.csv = csv.DictWriter(f, fieldnames=CSV_COLUMNS)
+            self.csv.writeheader()
+
+    def write(self, rows):
+        if self.fmt == "csv":
+            self.csv.writerows({k: json.dumps(v) if isinstance(v, list) else v for k, v in row.items()} for row in rows)
+        else:
+            self.f.writelines(json.dumps(row) + "\n" for row in rows)
+        self.f.flush()
+
+
+def bulk_score(input_path, output_path, workers=None, chunk_size=CHUNK_SIZE, top_k=3,
+               input_format=None, output_format=None):
+    """Score every record in input_path into output_path; returns (rows, errors)."""
+    in_fmt = _format_of(input_path, input_format)
+    out_fmt = _format_of(output_path, output_format)
+    workers = workers or os.cpu_count() or 1
+    chunks = ((chunk, top_k) for chunk in read_chunks(input_path, in_fmt, chunk_size))
+
+    rows = errors = 0
+    start = time.perf_counter()
+    with open(output_path, "w", newline="") as f:
+        writer = _Writer(f, out_fmt)
+        if workers == 1:
+            _init_worker()
+            scored = map(_score_packed, chunks)
+            pool = None
+        else:
+            pool = multiprocessing.Pool(workers, initializer=_init_worker)
+            scored = _scored_in_order(pool, chunks, workers * IN_FLIGHT_PER_WORKER)
+        try:
+            for result in scored:
+                writer.write(result)
+                rows += len(result)
+                errors += sum("error" in row for row in result)
+                print(f"⏳ {rows} rows scored ({rows / (time.perf_counter() - start):.0f} rows/s)", end="\r")
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+    print(f"\n✅ Scored {rows} rows ({errors} errors) into {output_path} in {time.perf_counter() - start:.1f}s")
+    return rows, errors
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score a CSV or JSONL file of symptom records offline.")
+    parser.add_argument("input")
+    parser.add_argument("output")
+    parser.add_argument("--workers", type=int, default=None, help="scoring processes (default: all cores)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--input-format", choices=("csv", "jsonl"), help="default: from the file extension")
+    parser.add_argument("--output-format", choices=("csv", "jsonl"), help="default: from the file extension")
+    args = parser.parse_args()
+    bulk_score(args.input, args.output, args.workers, args.chunk_size, args.top_k,
+               args.input_format, args.output_format)
@@ -1,33 +1,105 @@
 import os
+import numpy as np
 import pandas as pd
+from scipy import sparse
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import MultiLabelBinarizer
 
-def load_and_preprocess():
+# Rows parsed per pd.read_csv chunk; only one dense uint8 chunk is alive at a time
+CHUNK_SIZE = 10_000
+
+
+def _read_csv_sparse(path, chunksize=CHUNK_SIZE):
+    """
+    Stream the CSV in chunks into a uint8 CSR matrix.
+    Returns (X, diseases, symptom_cols).
+    """
+    header = pd.read_csv(path, nrows=0).columns
+    disease_raw, symptom_raw = header[0], list(header[1:])
+
+    blocks, labels = [], []
+    for n, chunk in enumerate(pd.read_csv(path, chunksize=chunksize, dtype={disease_raw: str})):
+        blocks.append(sparse.csr_matrix(_to_uint8(chunk[symptom_raw], n * chunksize)))
+        labels.append(chunk[disease_raw].to_numpy(dtype=str))
+
+    X = sparse.vstack(blocks, format="csr") if blocks else sparse.csr_matrix((0, len(symptom_raw)), dtype=np.uint8)
+    diseases = np.concatenate(labels) if labels else np.array([], dtype=str)
+    symptom_cols = [c.strip().lower() for c in symptom_raw]
+    return X, diseases, symptom_cols
+
+
+def _to_uint8(frame, first_row):
+    """
+    Symptom values as uint8, refusing anything the cast would silently
+    corrupt (NaN, non-numeric text, values outside 0..255).
+    """
+    values = frame.apply(pd.to_numeric, errors="coerce").to_numpy(dtype=np.float64)
+    bad = np.isnan(values) | (values < 0) | (values > 255) | (values != np.floor(values))
+    if bad.any():
+        row, col = np.argwhere(bad)[0]
+        value = frame.iat[row, col]
+        value = value.item() if hasattr(value, "item") else value
+        raise ValueError(f"❌ Invalid symptom value {value!r} in column {frame.columns[col]!r} "
+                         f"at data row {first_row + row + 1}; expected integers 0-255")
+    return values.astype(np.uint8)
+
+
+def _load_cached(cache_path, source_stat):
+    if not os.path.exists(cache_path):
+        return None
+    with np.load(cache_path, allow_pickle=False) as npz:
+        if int(npz["source_mtime_ns"]) != source_stat.st_mtime_ns or int(npz["source_size"]) != source_stat.st_size:
+            return None
+        X = sparse.csr_matrix((npz["data"], npz["indices"], npz["indptr"]), shape=tuple(npz["shape"]))
+        return X, npz["diseases"], npz["symptom_cols"].tolist()
+
+
+def _save_cached(cache_path, source_stat, X, diseases, symptom_cols):
+    tmp = cache_path + ".tmp.npz"
+    np.savez(tmp, data=X.data, indices=X.indices, indptr=X.indptr, shape=np.array(X.shape),
+             diseases=diseases, symptom_cols=np.asarray(symptom_cols, dtype=str),
+             source_mtime_ns=np.int64(source_stat.st_mtime_ns), source_size=np.int64(source_stat.st_size))
+    os.replace(tmp, cache_path)
+
+
+def load_and_preprocess(use_cache=True, chunksize=CHUNK_SIZE):
+    """
+    Load data/symptoms_dataset.csv as a sparse uint8 symptom matrix.
+
+    The parsed matrix is cached next to the CSV as symptoms_dataset.prep.npz
+    and reused until the CSV changes (size or mtime), so retraining skips
+    CSV parsing entirely.
+
+    Returns ((X_train, X_test, Y_train, Y_test), mlb, symptom_cols) with X and
+    Y as CSR matrices.
+    """
     base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     path = os.path.join(base_dir, "data", "symptoms_dataset.csv")
+    cache_path = os.path.join(base_dir, "data", "symptoms_dataset.prep.npz")
 
 
     if not os.path.exists(path):
         raise FileNotFoundError(f"❌ Dataset not found at: {path}")
 
-    # Read dataset
-    df = pd.read_csv(path)
-    df.columns = [c.strip().lower() for c in df.columns]
-
-    # First column = disease, rest = symptoms (binary features)
-    disease_col = df.columns[0]
-    symptom_cols = df.columns[1:]
-
-    print(f"✅ Detected {len(symptom_cols)} symptom columns and disease column '{disease_col}'.")
+    source_stat = os.stat(path)
+    cached = _load_cached(cache_path, source_stat) if use_cache else None
+    if cached is not None:
+        X, diseases, symptom_cols = cached
+        print(f"✅ Loaded preprocessed dataset from cache: {cache_path}")
+    else:
+        X, diseases, symptom_cols = _read_csv_sparse(path, chunksize)
+        if use_cache:
+            _save_cached(cache_path, source_stat, X, diseases, symptom_cols)
 
-    # Build input (X) and output (y)
-    X = df[symptom_cols]
-    y = df[disease_col].apply(lambda x: [x])  # Wrap each disease name in a list for multilabel encoding
+    print(f"✅ Detected {len(symptom_cols)} symptom columns, {X.shape[0]} rows, "
+          f"{X.nnz} non-zero entries ({X.data.nbytes + X.indices.nbytes + X.indptr.nbytes} bytes).")
 
-    mlb = MultiLabelBinarizer()
-    Y = mlb.fit_transform(y)
+    # Wrap each disease name in a list for multilabel encoding
+    mlb = MultiLabelBinarizer(sparse_output=True)
+    Y = mlb.fit_transform([[d] for d in diseases]).tocsr()
+    # The saved binarizer keeps returning dense arrays from transform(), as it always has
+    mlb.sparse_output = False
 
     X_train, X_test, Y_train, Y_test = train_test_split(X, Y, test_size=0.2, random_state=42)
 
-    return (X_train, X_test, Y_train, Y_test), mlb
+    return (X_train, X_test, Y_train, Y_test), mlb, symptom_cols
@@ -0,0 +1,52 @@
+import argparse
+import os
+import joblib
+from app.engine import LinearEngine
+from app import registry
+
+
+def _model_paths(model_path=None, mlb_path=None):
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    model_dir = os.path.join(base_dir, "models")
+    return (model_path or os.path.join(model_dir, "model.pkl"),
+            mlb_path or os.path.join(model_dir, "mlb.pkl"),
+            model_dir)
+
+
+def export_bundle(model_path=None, mlb_path=None, bundle_dir=None):
+    """
+    Convert the pickled OneVsRestClassifier + MultiLabelBinarizer in /models
+    into the .npy bundle the API server loads without sklearn or pandas.
+    """
+    model_path, mlb_path, model_dir = _model_paths(model_path, mlb_path)
+    bundle_dir = bundle_dir or os.path.join(model_dir, "model_bundle")
+
+    engine = LinearEngine.from_sklearn(joblib.load(model_path), joblib.load(mlb_path))
+    engine.save(bundle_dir)
+
+    size = sum(os.path.getsize(os.path.join(bundle_dir, f)) for f in os.listdir(bundle_dir))
+    print(f"✅ Exported {len(engine.feature_names)} features x {len(engine.classes)} classes "
+          f"to: {bundle_dir} ({size / 1024:.1f} KiB)")
+    return bundle_dir
+
+
+def publish_model(model_path=None, mlb_path=None, version=None, activate=True):
+    """Export the pickled model as a new version in the model registry."""
+    model_path, mlb_path, _ = _model_paths(model_path, mlb_path)
+    engine = LinearEngine.from_sklearn(joblib.load(model_path), joblib.load(mlb_path))
+    version = registry.publish(engine, version=version, activate=activate)
+    state = "now current" if activate else "not activated"
+    print(f"✅ Published model version {version} to: {registry.version_path(version)} ({state})")
+    return version
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export models/model.pkl for the API server.")
+    parser.add_argument("--version", help="registry version name (default: UTC timestamp)")
+    parser.add_argument("--no-activate", action="store_true", help="publish without making it current")
+    parser.add_argument("--bundle-dir", help="write a standalone bundle here instead of publishing")
+    args = parser.parse_args()
+    if args.bundle_dir:
+        export_bundle(bundle_dir=args.bundle_dir)
+    else:
+        publish_model(version=args.version, activate=not args.no_activate)
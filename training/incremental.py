@@ -0,0 +1,166 @@
+import argparse
+import os
+import tempfile
+import time
+import types
+import joblib
+import numpy as np
+from scipy import sparse
+from sklearn.linear_model import SGDClassifier
+from sklearn.multiclass import OneVsRestClassifier
+from sqlalchemy import and_, or_
+from app.db import SessionLocal, History
+from app.engine import LinearEngine
+from app.preprocess import preprocess_text
+from app import registry
+from training.data_prep import load_and_preprocess
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CHECKPOINT_PATH = os.path.join(BASE_DIR, "models", "incremental", "checkpoint.pkl")
+# Rows passed to each partial_fit call
+BATCH_SIZE = 5000
+
+
+def _new_model():
+    return OneVsRestClassifier(SGDClassifier(loss="log_loss", alpha=1e-4, random_state=42))
+
+
+def _bootstrap():
+    """First run only: one partial_fit pass over the full training set."""
+    print("🧠 No checkpoint found, bootstrapping from the training dataset...")
+    (X_train, X_test, Y_train, Y_test), mlb, symptom_cols = load_and_preprocess()
+    X = sparse.vstack([X_train, X_test], format="csr")
+    y = np.asarray(sparse.vstack([Y_train, Y_test]).argmax(axis=1)).ravel()
+    classes = np.arange(len(mlb.classes_))
+
+    model = _new_model()
+    for start in range(0, X.shape[0], BATCH_SIZE):
+        model.partial_fit(X[start:start + BATCH_SIZE], y[start:start + BATCH_SIZE], classes=classes)
+    return {
+        "model": model,
+        "classes": [str(c) for c in mlb.classes_],
+        "feature_names": list(symptom_cols),
+        # (confirmed_at, id) of the last confirmation consumed
+        "last_confirmed": None,
+        "rows_seen": X.shape[0],
+    }
+
+
+def load_checkpoint(path=CHECKPOINT_PATH):
+    if not os.path.exists(path):
+        return None
+    return joblib.load(path)
+
+
+def save_checkpoint(checkpoint, path=CHECKPOINT_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    os.close(fd)
+    joblib.dump(checkpoint, tmp)
+    os.replace(tmp, path)
+
+
+def _new_version():
+    """Timestamped version name, with a counter when that second is already taken."""
+    base = time.strftime("%Y%m%d-%H%M%S-inc", time.gmtime())
+    version, n = base, 1
+    while os.path.exists(registry.version_path(version)):
+        n += 1
+        version = f"{base}{n}"
+    return version
+
+
+def _labelled_batches(last_confirmed, feature_index, class_index):
+    """
+    Yield (X, y, last, skipped) batches of History rows confirmed (or
+    re-confirmed) after last_confirmed, a (confirmed_at, id) pair, in
+    confirmation order and vectorized like the API's predict_diseases.
+    """
+    session = SessionLocal()
+    try:
+        query = (session.query(History.id, History.symptoms, History.confirmed_disease, History.confirmed_at)
+                 .filter(History.confirmed_disease.isnot(None), History.confirmed_at.isnot(None)))
+        if last_confirmed:
+            confirmed_at, history_id = last_confirmed
+            query = query.filter(or_(History.confirmed_at > confirmed_at,
+                                     and_(History.confirmed_at == confirmed_at, History.id > history_id)))
+        query = query.order_by(History.confirmed_at, History.id)
+        rows, labels, last, skipped = [], [], last_confirmed, 0
+        for history_id, symptoms, disease, confirmed_at in query.yield_per(BATCH_SIZE):
+            last = (confirmed_at, history_id)
+            label = class_index.get(disease.strip().lower())
+            if label is None:
+                skipped += 1
+            else:
+                rows.append({feature_index[s] for s in preprocess_text(symptoms or "") if s in feature_index})
+                labels.append(label)
+            if len(labels) >= BATCH_SIZE:
+                yield _to_matrix(rows, len(feature_index)), np.array(labels), last, skipped
+                rows, labels, skipped = [], [], 0
+        if labels or last != last_confirmed:
+            yield _to_matrix(rows, len(feature_index)), np.array(labels, dtype=int), last, skipped
+    finally:
+        session.close()
+
+
+def _to_matrix(rows, n_features):
+    indptr = np.cumsum([0] + [len(r) for r in rows])
+    indices = np.fromiter((i for r in rows for i in sorted(r)), dtype=np.int32, count=int(indptr[-1]))
+    return sparse.csr_matrix((np.ones(len(indices)), indices, indptr), shape=(len(rows), n_features))
+
+
+def update_model(activate=False):
+    """
+    Apply partial_fit with every History row confirmed since the last
+    checkpoint, publish the result as a new model version and then save
+    the checkpoint. Returns the new version, or None when there was
+    nothing new. If publishing fails the checkpoint is left as it was, so
+    the next run learns the same rows again.
+
+    The SGD checkpoint is trained separately from train_model.py's full
+    LogisticRegression fit, so by default the version is only published
+    as a candidate; pass activate=True (--activate) to serve it.
+    """
+    start = time.perf_counter()
+    checkpoint = load_checkpoint()
+    is_new = checkpoint is None
+    if is_new:
+        checkpoint = _bootstrap()
+
+    model = checkpoint["model"]
+    feature_index = {name: i for i, name in enumerate(checkpoint["feature_names"])}
+    class_index = {name.lower(): i for i, name in enumerate(checkpoint["classes"])}
+
+    used = skipped = 0
+    for X, y, last, batch_skipped in _labelled_batches(checkpoint["last_confirmed"], feature_index, class_index):
+        if len(y):
+            model.partial_fit(X, y)
+        used += len(y)
+        skipped += batch_skipped
+        checkpoint["last_confirmed"] = last
+    checkpoint["rows_seen"] += used
+
+    last = checkpoint["last_confirmed"]
+    print(f"✅ {used} new confirmed rows applied, {skipped} skipped (disease not in the label set); "
+          f"resumed after confirmation {last[0].isoformat() if last else 'none'}")
+    if not used and not is_new:
+        save_checkpoint(checkpoint)
+        print("ℹ️ Nothing new to learn; keeping the current model version.")
+        return None
+
+    labels = types.SimpleNamespace(classes_=np.array(checkpoint["classes"]))
+    engine = LinearEngine.from_sklearn(model, labels, checkpoint["feature_names"])
+    version = registry.publish(engine, version=_new_version(), activate=activate)
+    save_checkpoint(checkpoint)
+    print(f"✅ Published model version {version} in {time.perf_counter() - start:.1f}s")
+    if not activate:
+        print(f"ℹ️ Not activated; serve it with POST /admin/reload {{\"version\": \"{version}\"}} or --activate")
+    return version
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Incrementally update the model from confirmed history rows.")
+    parser.add_argument("--activate", action="store_true",
+                        help="make the new version current (default: publish it as a candidate only)")
+    args = parser.parse_args()
+    update_model(activate=args.activate)
@@ -0,0 +1,291 @@
+"""
+Load-replay benchmark for the Flask API.
+
+Replays recorded requests (a JSON list or NDJSON of {"symptoms": ...} or
+{"method", "path", "json", "auth"} records) and/or a synthetic workload
+against /predict, /history and /auth/login, either in-process through
+the Flask test client or against a running server (--url), and reports
+throughput, latency percentiles and error rate per endpoint.
+
+    python -m training.load_test --synthetic 2000 --concurrency 8
+    python -m training.load_test --url http://127.0.0.1:8000 --replay examples/test_requests.json
+    python -m training.load_test --synthetic 2000 --baseline benchmarks/load_test.json --max-regression 0.2
+"""
+
+import argparse
+import atexit
+import datetime
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+BENCH_USER = os.environ.get("CURESENSE_BENCH_USER", "loadtest")
+BENCH_PASSWORD = os.environ.get("CURESENSE_BENCH_PASSWORD", "loadtest-password")
+# Symptoms per synthetic request -> probability
+DEFAULT_SYMPTOM_DIST = {1: 0.15, 2: 0.25, 3: 0.3, 4: 0.2, 6: 0.1}
+# Endpoint -> share of synthetic requests
+DEFAULT_MIX = {"predict": 0.85, "history": 0.1, "login": 0.05}
+
+
+def _parse_weights(text, key=str):
+    """'1:0.2,3:0.8' -> {1: 0.2, 3: 0.8}"""
+    weights = {}
+    for part in text.split(","):
+        k, _, v = part.partition(":")
+        weights[key(k.strip())] = float(v)
+    return weights
+
+
+def _pick(rng, weights):
+    keys = list(weights)
+    return rng.choices(keys, weights=[weights[k] for k in keys])[0]
+
+
+class InProcessClient:
+    """
+    Flask test client; one per thread since it is not thread-safe.
+    Unless DATABASE_URL is set, the app writes to a throwaway SQLite
+    database instead of the tracked data/app.db.
+    """
+
+    def __init__(self):
+        if "DATABASE_URL" not in os.environ:
+            tmp = tempfile.mkdtemp(prefix="curesense-load-")
+            # Registered before the app's history writer, so it runs after the writer's final flush
+            atexit.register(shutil.rmtree, tmp, ignore_errors=True)
+            os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'load_test.db')}"
+        from app.app import app  # creates the schema via init_db()
+        self.app = app
+        self._local = threading.local()
+
+    def request(self, method, path, body=None, headers=None):
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        response = client.open(path, method=method, json=body, headers=headers or {})
+        return response.status_code, response.get_data()
+
+
+class HttpClient:
+    def __init__(self, base_url, timeout=30):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    def request(self, method, path, body=None, headers=None):
+        headers = dict(headers or {})
+        data = None
+        if body is not None:
+            data = json.dumps(body).encode()
+            headers["Content-Type"] = "application/json"
+        req = urllib.request.Request(self.base_url + path, data=data, headers=headers, method=method)
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as response:
+                return response.status, response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read()
+
+
+def login(client, username=BENCH_USER, password=BENCH_PASSWORD):
+    """Register the benchmark user if needed and return a bearer token."""
+    credentials = {"username": username, "password": password}
+    client.request("POST", "/auth/register", credentials)
+    status, body = client.request("POST", "/auth/login", credentials)
+    if status != 200:
+        raise RuntimeError(f"Login as {username} failed with HTTP {status}: {body[:200]!r}")
+    return json.loads(body)["token"]
+
+
+def load_replay(path):
+    """Requests from a JSON list or NDJSON file; records that are not API requests are skipped."""
+    with open(path) as f:
+        text = f.read().strip()
+    if not text:
+        return []
+    if text.startswith("["):
+        records = json.loads(text)
+    else:
+        records = [json.loads(line) for line in text.splitlines() if line.strip()]
+
+    ops = []
+    for record in records:
+        if isinstance(record, str):
+            record = {"symptoms": record}
+        if not isinstance(record, dict):
+            continue
+        if "path" in record:
+            ops.append({"endpoint": record["path"].strip("/").split("?")[0] or "home",
+                        "method": record.get("method", "GET").upper(), "path": record["path"],
+                        "json": record.get("json", record.get("body")), "auth": bool(record.get("auth")),
+                        "expect": record.get("expect", 200)})
+        elif record.get("symptoms"):
+            ops.append({"endpoint": "predict", "method": "POST", "path": "/predict",
+                        "json": {"symptoms": record["symptoms"]}, "auth": bool(record.get("auth")), "expect": 200})
+    return ops
+
+
+def synthetic_workload(n, vocab, symptom_dist=DEFAULT_SYMPTOM_DIST, auth_ratio=0.5, mix=DEFAULT_MIX, seed=0):
+    """
+    n requests drawn from mix. /predict bodies join symptom_dist-many random
+    symptoms from vocab and carry a token with probability auth_ratio
+    (authenticated predictions also write history); /history is always
+    authenticated.
+    """
+    rng = random.Random(seed)
+    ops = []
+    for _ in range(n):
+        endpoint = _pick(rng, mix)
+        if endpoint == "predict":
+            count = min(_pick(rng, symptom_dist), len(vocab))
+            symptoms = ", ".join(rng.sample(vocab, count))
+            ops.append({"endpoint": "predict", "method": "POST", "path": "/predict",
+                        "json": {"symptoms": symptoms}, "auth": rng.random() < auth_ratio, "expect": 200})
+        elif endpoint == "history":
+            ops.append({"endpoint": "history", "method": "GET", "path": "/history?limit=20",
+                        "json": None, "auth": True, "expect": 200})
+        elif endpoint == "login":
+            ops.append({"endpoint": "auth/login", "method": "POST", "path": "/auth/login",
+                        "json": {"username": BENCH_USER, "password": BENCH_PASSWORD}, "auth": False, "expect": 200})
+        else:
+            raise ValueError(f"Unknown endpoint in mix: {endpoint}")
+    return ops
+
+
+def default_vocab():
+    """Symptom names the served model knows about."""
+    from app import utils
+    return list(utils.state.engine.feature_names)
+
+
+def _summarize(latencies, errors, elapsed):
+    lat = np.asarray(latencies) * 1000
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "error_rate": round(errors / len(latencies), 4) if latencies else 0.0,
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else None,
+        "latency_ms": {p: round(float(np.percentile(lat, q)), 3) if len(lat) else None
+                       for p, q in (("p50", 50), ("p90", 90), ("p99", 99), ("max", 100))},
+    }
+
+
+def run_workload(client, ops, concurrency=8, warmup=50):
+    token = login(client) if any(op["auth"] for op in ops) else None
+
+    def send(op):
+        headers = {"Authorization": f"Bearer {token}"} if op["auth"] else None
+        start = time.perf_counter()
+        try:
+            status, _ = client.request(op["method"], op["path"], op["json"], headers)
+        except Exception:
+            status = None
+        return op["endpoint"], time.perf_counter() - start, status == op["expect"]
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(send, ops[:warmup]))
+        start = time.perf_counter()
+        results = list(pool.map(send, ops))
+        elapsed = time.perf_counter() - start
+
+    by_endpoint = {}
+    for endpoint, latency, ok in results:
+        entry = by_endpoint.setdefault(endpoint, ([], [0]))
+        entry[0].append(latency)
+        entry[1][0] += not ok
+    return {
+        "overall": _summarize([r[1] for r in results], sum(not r[2] for r in results), elapsed),
+        "endpoints": {e: _summarize(lat, err[0], elapsed) for e, (lat, err) in sorted(by_endpoint.items())},
+    }
+
+
+def check_regressions(report, baseline, max_regression):
+    """
+    Compare against a previous report: throughput may drop and p99 latency
+    may grow by at most max_regression (a fraction), and the error rate
+    may not rise by more than max_regression percentage points.
+    """
+    failures = []
+    for name, new in [("overall", report["overall"])] + list(report["endpoints"].items()):
+        old = baseline["overall"] if name == "overall" else baseline.get("endpoints", {}).get(name)
+        if not old or not new["requests"]:
+            continue
+        if old["throughput_rps"] and new["throughput_rps"] < old["throughput_rps"] * (1 - max_regression):
+            failures.append(f"{name}: throughput {old['throughput_rps']} -> {new['throughput_rps']} req/s")
+        if old["latency_ms"]["p99"] and new["latency_ms"]["p99"] > old["latency_ms"]["p99"] * (1 + max_regression):
+            failures.append(f"{name}: p99 {old['latency_ms']['p99']} -> {new['latency_ms']['p99']} ms")
+        if new["error_rate"] > old["error_rate"] + max_regression / 100:
+            failures.append(f"{name}: error rate {old['error_rate']} -> {new['error_rate']}")
+    return failures
+
+
+def _print_report(report):
+    print("\n📊 Load test:")
+    print(f"  {'endpoint':<14} {'requests':>8} {'req/s':>9} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for name, r in [("overall", report["overall"])] + list(report["endpoints"].items()):
+        lat = r["latency_ms"]
+        print(f"  {name:<14} {r['requests']:>8} {r['throughput_rps']:>9.1f} {lat['p50']:>8.2f} "
+              f"{lat['p90']:>8.2f} {lat['p99']:>8.2f} {r['errors']:>7}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay or synthesize API traffic and measure throughput and latency.")
+    parser.add_argument("--url", help="base URL of a running server (default: the app in-process)")
+    parser.add_argument("--replay", action="append", default=[], help="JSON list or NDJSON file of requests")
+    parser.add_argument("--synthetic", type=int, default=0, help="number of synthetic requests to add")
+    parser.add_argument("--symptom-dist", help="symptom count distribution, e.g. '1:0.2,3:0.5,6:0.3'")
+    parser.add_argument("--auth-ratio", type=float, default=0.5, help="share of /predict calls sent with a token")
+    parser.add_argument("--mix", help="endpoint mix, e.g. 'predict:0.8,history:0.15,login:0.05'")
+    parser.add_argument("--vocab", help="file with one symptom per line (default: the served model's features)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the JSON report here (e.g. benchmarks/load_test.json, git-ignored)")
+    parser.add_argument("--baseline", help="previous report to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="allowed relative regression (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    ops = [op for path in args.replay for op in load_replay(path)]
+    if args.synthetic:
+        if args.vocab:
+            with open(args.vocab) as f:
+                vocab = [line.strip() for line in f if line.strip()]
+        else:
+            vocab = default_vocab()
+        ops += synthetic_workload(
+            args.synthetic, vocab,
+            _parse_weights(args.symptom_dist, int) if args.symptom_dist else DEFAULT_SYMPTOM_DIST,
+            args.auth_ratio,
+            _parse_weights(args.mix) if args.mix else DEFAULT_MIX,
+            args.seed)
+    if not ops:
+        parser.error("no requests to send: pass --replay files with requests and/or --synthetic N")
+
+    client = HttpClient(args.url) if args.url else InProcessClient()
+    print(f"🚀 Sending {len(ops)} requests to {args.url or 'the in-process app'} with concurrency {args.concurrency}...")
+    report = run_workload(client, ops, args.concurrency)
+    report.update({"generated_at": datetime.datetime.utcnow().isoformat(), "target": args.url or "in-process",
+                   "concurrency": args.concurrency})
+    _print_report(report)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ Report written to: {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            failures = check_regressions(report, json.load(f), args.max_regression)
+        if failures:
+            print(f"❌ Regressed more than {args.max_regression:.0%} against {args.baseline}:")
+            for failure in failures:
+                print(f"   {failure}")
+            sys.exit(1)
+        print(f"✅ No regressions against {args.baseline}")
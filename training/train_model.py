@@ -1,29 +1,76 @@
+import argparse
+import json
 import joblib
 import os
+import time
+import numpy as np
+from scipy import sparse
 from sklearn.multiclass import OneVsRestClassifier
 from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import classification_report, f1_score
 from training.data_prep import load_and_preprocess
+from training.export_model import publish_model
 
+MODES = ("ovr", "multinomial")
 
-def train_and_save():
+
+def build_classifier(mode="ovr", n_jobs=-1, max_iter=500):
+    """
+    "ovr": one liblinear LogisticRegression per disease, fitted in parallel
+    across n_jobs processes (-1 = all cores).
+    "multinomial": a single softmax LogisticRegression over all diseases.
+    """
+    if mode == "ovr":
+        return OneVsRestClassifier(LogisticRegression(max_iter=max_iter, solver="liblinear"), n_jobs=n_jobs)
+    if mode == "multinomial":
+        return LogisticRegression(max_iter=max_iter, solver="lbfgs")
+    raise ValueError(f"Unknown training mode: {mode} (expected one of {MODES})")
+
+
+def fit_classifier(clf, X_train, Y_train):
+    if isinstance(clf, OneVsRestClassifier):
+        return clf.fit(X_train, Y_train)
+    # The multinomial model learns one label per row: the index into mlb.classes_
+    return clf.fit(X_train, np.asarray(Y_train.argmax(axis=1)).ravel())
+
+
+def predict_indicator(clf, X, n_classes):
+    """Predictions as a label-indicator matrix, whatever the model type."""
+    if isinstance(clf, OneVsRestClassifier):
+        return clf.predict(X)
+    labels = clf.predict(X)
+    return sparse.csr_matrix((np.ones(len(labels), dtype=int), (np.arange(len(labels)), labels)),
+                             shape=(len(labels), n_classes))
+
+
+def train_and_save(mode="ovr", n_jobs=-1, activate=True):
     """
     Train a multi-label disease prediction model using symptom data,
-    then save both the trained model and label binarizer in /models.
+    then save both the trained model and label binarizer in /models
+    and publish it as a new version in the model registry.
     """
     print("🚀 Starting training process...")
-    (X_train, X_test, Y_train, Y_test), mlb = load_and_preprocess()
+    (X_train, X_test, Y_train, Y_test), mlb, symptom_cols = load_and_preprocess()
     print(f"✅ Data loaded: {X_train.shape[0]} training samples, {X_test.shape[0]} test samples")
 
-    clf = OneVsRestClassifier(LogisticRegression(max_iter=500, solver="liblinear"))
-    print("🧠 Training model... This may take a few minutes depending on dataset size.")
-    clf.fit(X_train, Y_train)
+    clf = build_classifier(mode, n_jobs)
+    print(f"🧠 Training {mode} model... This may take a few minutes depending on dataset size.")
+    start = time.perf_counter()
+    fit_classifier(clf, X_train, Y_train)
+    print(f"⏱️ Training took {time.perf_counter() - start:.1f}s")
 
-    preds = clf.predict(X_test)
+    preds = predict_indicator(clf, X_test, len(mlb.classes_))
     f1 = f1_score(Y_test, preds, average="micro")
     print("\n📊 Evaluation Metrics:")
     print("F1-score (micro):", round(f1, 3))
-    print(classification_report(Y_test, preds, target_names=mlb.classes_))
+    print(classification_report(Y_test, preds, target_names=mlb.classes_, zero_division=0))
+
+    # Fitted on a sparse matrix, so sklearn recorded no column names; store them
+    # so the pickle stays self-describing for the exporter and the server.
+    feature_names = np.asarray(symptom_cols, dtype=object)
+    clf.feature_names_in_ = feature_names
+    for est in getattr(clf, "estimators_", []):
+        est.feature_names_in_ = feature_names
 
     base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     model_dir = os.path.join(base_dir, "models")
@@ -34,11 +81,49 @@ def train_and_save():
 
     joblib.dump(clf, model_path)
     joblib.dump(mlb, mlb_path)
+    version = publish_model(model_path, mlb_path, activate=activate)
 
     print(f"\n✅ Model saved to: {model_path}")
     print(f"✅ Label binarizer saved to: {mlb_path}")
     print("🎉 Training and saving completed successfully!")
+    return version
+
+
+def compare_modes(configs=(("ovr", 1), ("ovr", -1), ("multinomial", -1)), report_path=None):
+    """
+    Fit each (mode, n_jobs) on the same split without saving anything and
+    report wall-clock fit time and micro-F1, optionally as JSON.
+    """
+    (X_train, X_test, Y_train, Y_test), mlb, _ = load_and_preprocess()
+    report = []
+    for mode, n_jobs in configs:
+        clf = build_classifier(mode, n_jobs)
+        start = time.perf_counter()
+        fit_classifier(clf, X_train, Y_train)
+        fit_s = time.perf_counter() - start
+        f1 = f1_score(Y_test, predict_indicator(clf, X_test, len(mlb.classes_)), average="micro")
+        report.append({"mode": mode, "n_jobs": n_jobs, "fit_seconds": round(fit_s, 3), "f1_micro": round(float(f1), 4)})
+
+    print("\n📊 Training modes:")
+    print(f"  {'mode':<12} {'n_jobs':>6} {'fit (s)':>9} {'F1 micro':>9}")
+    for r in report:
+        print(f"  {r['mode']:<12} {r['n_jobs']:>6} {r['fit_seconds']:>9.2f} {r['f1_micro']:>9.3f}")
+    if report_path:
+        with open(report_path, "w") as f:
+            json.dump({"cpu_count": os.cpu_count(), "results": report}, f, indent=2)
+        print(f"✅ Report written to: {report_path}")
+    return report
 
 
 if __name__ == "__main__":
-    train_and_save()
+    parser = argparse.ArgumentParser(description="Train and publish the disease prediction model.")
+    parser.add_argument("--mode", choices=MODES, default="ovr")
+    parser.add_argument("--n-jobs", type=int, default=-1, help="parallel fits for ovr (-1 = all cores)")
+    parser.add_argument("--no-activate", action="store_true", help="publish without making it current")
+    parser.add_argument("--compare", action="store_true", help="time every mode instead of training one")
+    parser.add_argument("--report", help="write the --compare results to this JSON file")
+    args = parser.parse_args()
+    if args.compare:
+        compare_modes(report_path=args.report)
+    else:
+        train_and_save(args.mode, args.n_jobs, activate=not args.no_activate)
@@ -0,0 +1,42 @@
+import os
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+API_BASE = os.environ.get("CURESENSE_API_BASE", "https://curesense-ai-symptom-recommender-4.onrender.com")
+CONNECT_TIMEOUT = float(os.environ.get("CURESENSE_API_CONNECT_TIMEOUT", 5))
+READ_TIMEOUT = float(os.environ.get("CURESENSE_API_READ_TIMEOUT", 15))
+RETRIES = int(os.environ.get("CURESENSE_API_RETRIES", 3))
+RETRY_BACKOFF = float(os.environ.get("CURESENSE_API_RETRY_BACKOFF", 0.5))
+POOL_SIZE = int(os.environ.get("CURESENSE_API_POOL_SIZE", 10))
+
+
+def make_session(retries=RETRIES, backoff=RETRY_BACKOFF, pool_size=POOL_SIZE):
+    """
+    requests.Session with keep-alive pooling and retries.
+
+    Failed connection attempts are retried for every method since the
+    request never reached the server. Read errors and 502/503/504 responses
+    are retried only for idempotent methods, so a POST /predict is never
+    sent (and written to history) twice.
+    """
+    retry = Retry(
+        total=retries,
+        connect=retries,
+        read=retries,
+        status=retries,
+        backoff_factor=backoff,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=pool_size, pool_maxsize=pool_size)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def post(session, path, json_data=None, headers=None, base=API_BASE,
+         timeout=(CONNECT_TIMEOUT, READ_TIMEOUT)):
+    return session.post(f"{base.rstrip('/')}{path}", json=json_data or {}, headers=headers or {}, timeout=timeout)
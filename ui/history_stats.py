@@ -0,0 +1,47 @@
+from collections import Counter
+import pandas as pd
+
+# History column -> label used for the dashboard frame
+COUNTED_COLUMNS = {"Predicted Diseases": "Disease", "Medications": "Medication", "Suggested Doctors": "Doctor"}
+
+
+def _terms(cell):
+    # Missing cells count as "Unknown", like the dashboard always has
+    for term in (cell or "Unknown").split(","):
+        term = term.strip()
+        if term and term.lower() != "none":
+            yield term
+
+
+class HistoryStats:
+    """Running per-column term counts over history rows, updated as rows arrive."""
+
+    def __init__(self):
+        self.total = 0
+        self.counts = {column: Counter() for column in COUNTED_COLUMNS}
+
+    def update(self, records):
+        for record in records:
+            self.total += 1
+            for column, counter in self.counts.items():
+                counter.update(_terms(record.get(column)))
+        return self
+
+    @classmethod
+    def from_frame(cls, df):
+        """Full recompute over a DataFrame with split/explode instead of per-row Python."""
+        stats = cls()
+        stats.total = len(df)
+        for column in COUNTED_COLUMNS:
+            if column not in df:
+                continue
+            terms = df[column].mask(df[column] == "").fillna("Unknown").astype(str).str.split(",").explode().str.strip()
+            terms = terms[(terms != "") & (terms.str.lower() != "none")]
+            stats.counts[column] = Counter(terms.value_counts().to_dict())
+        return stats
+
+    def frame(self, column):
+        """Counts for one column as a [label, "Count"] frame, most common first."""
+        label = COUNTED_COLUMNS[column]
+        items = self.counts[column].most_common()
+        return pd.DataFrame(items, columns=[label, "Count"])
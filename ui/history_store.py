@@ -0,0 +1,70 @@
+import csv
+import io
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows: only sessions within this process are serialized
+    fcntl = None
+
+HISTORY_COLUMNS = ["Date & Time", "Symptoms", "Predicted Diseases", "Medications", "Suggested Doctors"]
+
+# Streamlit runs every session as a thread of one process; flock covers other processes.
+_lock = threading.Lock()
+
+
+class _FileLock:
+    def __init__(self, f, exclusive):
+        self.f, self.mode = f, (fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH) if fcntl else None
+
+    def __enter__(self):
+        if fcntl:
+            fcntl.flock(self.f.fileno(), self.mode)
+
+    def __exit__(self, *exc):
+        if fcntl:
+            fcntl.flock(self.f.fileno(), fcntl.LOCK_UN)
+
+
+def append_entry(path, entry, columns=HISTORY_COLUMNS):
+    """
+    Append one row to the history CSV, writing the header first if the file
+    is empty. Costs the same however long the file already is.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=columns, extrasaction="ignore")
+    with _lock, open(path, "a", newline="", encoding="utf-8") as f, _FileLock(f, exclusive=True):
+        if f.seek(0, os.SEEK_END) == 0:
+            writer.writeheader()
+        writer.writerow(entry)
+        # One write per row so readers never see half of it
+        f.write(buf.getvalue())
+
+
+def read_since(path, offset=0, columns=None):
+    """
+    Rows appended after byte offset, as dicts.
+    Returns (records, new_offset, columns); pass new_offset and columns back
+    on the next call to read only what was added in between. columns is
+    read from the header when offset is 0.
+    """
+    if not os.path.exists(path):
+        return [], 0, columns
+    with _lock, open(path, "rb") as f, _FileLock(f, exclusive=False):
+        size = f.seek(0, os.SEEK_END)
+        if size < offset:
+            # File was truncated or replaced: start over
+            offset, columns = 0, None
+        f.seek(offset)
+        data = f.read(size - offset)
+    # Only consume complete lines; a trailing partial row is picked up next time
+    end = data.rfind(b"\n") + 1
+    if end == 0:
+        return [], offset, columns
+    rows = csv.reader(io.StringIO(data[:end].decode("utf-8"), newline=""))
+    if columns is None:
+        columns = next(rows, None)
+    records = [dict(zip(columns, row)) for row in rows if row]
+    return records, offset + end, columns
@@ -0,0 +1,147 @@
+"""
+Background speech-to-text for the Streamlit UI.
+
+Audio is transcribed on a small thread pool so the script thread never
+waits on a recognizer. Long files are read and recognized in fixed-length
+chunks, and the partial transcript is visible while later chunks are still
+running. Jobs are cached by the SHA-256 of the audio, failures included,
+so re-uploading the same file (or a Streamlit rerun) never transcribes it
+twice; forget() drops a job so it can be retried.
+
+The backend is chosen with CURESENSE_TRANSCRIBE_BACKENDS, a comma-separated
+fallback order (default "google,sphinx"). "google" needs network access.
+"sphinx" (pip install pocketsphinx) and "vosk" (pip install vosk, plus a
+model in CURESENSE_VOSK_MODEL) run fully offline.
+"""
+
+import functools
+import hashlib
+import io
+import json
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import speech_recognition as sr
+
+BACKENDS_ORDER = [b.strip() for b in os.environ.get("CURESENSE_TRANSCRIBE_BACKENDS", "google,sphinx").split(",") if b.strip()]
+CHUNK_SECONDS = float(os.environ.get("CURESENSE_TRANSCRIBE_CHUNK_SECONDS", 30))
+WORKERS = int(os.environ.get("CURESENSE_TRANSCRIBE_WORKERS", 2))
+CACHE_SIZE = int(os.environ.get("CURESENSE_TRANSCRIBE_CACHE_SIZE", 256))
+VOSK_MODEL = os.environ.get("CURESENSE_VOSK_MODEL")
+
+
+def _google(recognizer, audio):
+    return recognizer.recognize_google(audio)
+
+
+def _sphinx(recognizer, audio):
+    return recognizer.recognize_sphinx(audio)
+
+
+@functools.lru_cache(maxsize=1)
+def _vosk_model(path):
+    # Hundreds of MB on disk: load once per process, not once per chunk
+    from vosk import Model
+    return Model(path)
+
+
+def _vosk(recognizer, audio):
+    from vosk import KaldiRecognizer
+    if not VOSK_MODEL:
+        raise RuntimeError("CURESENSE_VOSK_MODEL is not set")
+    rec = KaldiRecognizer(_vosk_model(VOSK_MODEL), 16000)
+    rec.AcceptWaveform(audio.get_raw_data(convert_rate=16000, convert_width=2))
+    return json.loads(rec.FinalResult()).get("text", "")
+
+
+# name -> fn(recognizer, sr.AudioData) -> text; register more with BACKENDS[name] = fn
+BACKENDS = {"google": _google, "sphinx": _sphinx, "vosk": _vosk}
+
+
+def recognize(recognizer, audio, backends=None):
+    """Try each backend in order and return the first transcript."""
+    errors = []
+    for name in backends or BACKENDS_ORDER:
+        try:
+            return BACKENDS[name](recognizer, audio)
+        except sr.UnknownValueError:
+            # Audible but no speech recognized: another engine will not do better
+            return ""
+        except Exception as e:
+            errors.append(f"{name}: {e}")
+    raise RuntimeError("All transcription backends failed: " + "; ".join(errors))
+
+
+class TranscriptionJob:
+    """Handle for one transcription; text grows chunk by chunk until done."""
+
+    def __init__(self, digest):
+        self.digest = digest
+        self.chunks = []
+        self.error = None
+        self.done = threading.Event()
+
+    @property
+    def text(self):
+        return " ".join(c for c in self.chunks if c)
+
+
+class Transcriber:
+    def __init__(self, backends=None, workers=WORKERS, chunk_seconds=CHUNK_SECONDS, cache_size=CACHE_SIZE):
+        self.backends = backends or BACKENDS_ORDER
+        self.chunk_seconds = chunk_seconds
+        self.cache_size = cache_size
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="transcribe")
+        # sha256 -> job, finished or still running, most recently used last
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _job_for(self, digest):
+        """(job, created): an existing job for this audio or a new one."""
+        with self._lock:
+            job = self._jobs.get(digest)
+            if job is not None:
+                self._jobs.move_to_end(digest)
+                return job, False
+            job = self._jobs[digest] = TranscriptionJob(digest)
+            while len(self._jobs) > self.cache_size:
+                self._jobs.popitem(last=False)
+            return job, True
+
+    def forget(self, digest):
+        """Drop a cached job (e.g. a failed one) so the same audio is transcribed again."""
+        with self._lock:
+            self._jobs.pop(digest, None)
+
+    def submit_file(self, data: bytes):
+        """Transcribe WAV/AIFF/FLAC bytes in the background; returns a TranscriptionJob."""
+        job, created = self._job_for(hashlib.sha256(data).hexdigest())
+        if created:
+            self._pool.submit(self._run, job, self._file_chunks, data)
+        return job
+
+    def submit_audio(self, audio: sr.AudioData):
+        """Transcribe already-captured audio (e.g. from the microphone) in the background."""
+        job, created = self._job_for(hashlib.sha256(audio.get_wav_data()).hexdigest())
+        if created:
+            self._pool.submit(self._run, job, lambda a: iter([a]), audio)
+        return job
+
+    def _file_chunks(self, data):
+        with sr.AudioFile(io.BytesIO(data)) as source:
+            while True:
+                audio = sr.Recognizer().record(source, duration=self.chunk_seconds)
+                if not audio.frame_data:
+                    return
+                yield audio
+
+    def _run(self, job, chunks, source):
+        recognizer = sr.Recognizer()
+        try:
+            for audio in chunks(source):
+                job.chunks.append(recognize(recognizer, audio, self.backends))
+        except Exception as e:
+            job.error = str(e)
+        finally:
+            job.done.set()
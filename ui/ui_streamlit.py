@@ -1,56 +1,59 @@
 import streamlit as st
-import requests
 import speech_recognition as sr
 import pandas as pd
 import difflib
-import io
 import os
 from datetime import datetime
 import plotly.express as px
+from history_store import append_entry, read_since
+from history_stats import HistoryStats
+import api_client
+from transcription import Transcriber
 
-API_BASE = "https://curesense-ai-symptom-recommender-4.onrender.com"
+API_BASE = api_client.API_BASE
 APP_TITLE = "⚕ CureSense — AI Symptom Recommender"
 PRIMARY_COLOR = "#007bff"
 BG_COLOR = "#f4f8ff"
 CARD_COLOR = "#ffffff"
 TEXT_COLOR = "#1a1a1a"
 SUB_TITLE_COLOR = "#7066AB"
+TRANSCRIBE_POLL_SECONDS = 1
 HISTORY_FILE = "data/history.csv"
 
 def save_history_entry(entry: dict):
-    os.makedirs(os.path.dirname(HISTORY_FILE), exist_ok=True)
     try:
-        if not os.path.exists(HISTORY_FILE) or os.path.getsize(HISTORY_FILE) == 0:
-            pd.DataFrame([entry]).to_csv(HISTORY_FILE, index=False)
-        else:
-            try:
-                df = pd.read_csv(HISTORY_FILE)
-            except pd.errors.EmptyDataError:
-                df = pd.DataFrame(columns=list(entry.keys()))
-            df = pd.concat([df, pd.DataFrame([entry])], ignore_index=True)
-            df.to_csv(HISTORY_FILE, index=False)
+        append_entry(HISTORY_FILE, entry)
     except Exception as e:
         import traceback
         st.error(f"Error saving history: {e}")
         st.text(traceback.format_exc())
 
 def load_history():
-    if not os.path.exists(HISTORY_FILE):
-        return []
+    """Append rows written since the last call (by any session) to history_cache."""
     try:
-        if os.path.getsize(HISTORY_FILE) == 0:
-            return []
-        df = pd.read_csv(HISTORY_FILE)
-        if not df.empty and len(df.columns) > 0:
-            return df.to_dict("records")
-        return []
-    except pd.errors.EmptyDataError:
-        return []
+        records, offset, columns = read_since(HISTORY_FILE, st.session_state.history_offset,
+                                              st.session_state.history_columns)
     except Exception as e:
         import traceback
         st.error(f"Error loading history: {e}")
         st.text(traceback.format_exc())
-        return []
+        return st.session_state.history_cache
+    if offset < st.session_state.history_offset:
+        st.session_state.history_cache = []
+        st.session_state.history_stats = HistoryStats()
+    if not st.session_state.history_cache:
+        # First (full) load: one vectorized pass rather than row by row
+        st.session_state.history_stats = HistoryStats.from_frame(pd.DataFrame(records))
+    else:
+        st.session_state.history_stats.update(records)
+    st.session_state.history_offset, st.session_state.history_columns = offset, columns
+    st.session_state.history_cache.extend(records)
+    return st.session_state.history_cache
+
+@st.cache_data(max_entries=8)
+def dashboard_frames(history_version, _stats):
+    """Count frames for the dashboard; the append-only file's byte offset identifies its contents."""
+    return {column: _stats.frame(column) for column in _stats.counts}
 
 st.set_page_config(page_title=APP_TITLE, layout="centered", page_icon="⚕")
 
@@ -140,34 +143,66 @@ st.markdown(f"""
     </style>
 """, unsafe_allow_html=True)
 
+@st.cache_resource
+def api_session():
+    """One pooled, retrying HTTP session shared by every session of this process."""
+    return api_client.make_session()
+
 def api_post(path, json_data=None, headers=None):
-    url = f"{API_BASE.rstrip('/')}{path}"
-    return requests.post(url, json=json_data or {}, headers=headers or {}, timeout=15)
+    return api_client.post(api_session(), path, json_data, headers, base=API_BASE)
+
+@st.cache_resource
+def transcriber():
+    """Background transcription pool and transcript cache shared by every session."""
+    return Transcriber()
 
 def transcribe_audio(uploaded_file):
+    """Start transcribing in the background; returns a TranscriptionJob (or None)."""
     if not uploaded_file:
-        return ""
-    r = sr.Recognizer()
-    try:
-        uploaded_file.seek(0)
-        bio = io.BytesIO(uploaded_file.read())
-        with sr.AudioFile(bio) as source:
-            audio = r.record(source)
-        return r.recognize_google(audio)
-    except Exception as e:
-        st.error(f"Audio transcription failed: {e}")
-        return ""
+        return None
+    return transcriber().submit_file(uploaded_file.getvalue())
+
+@st.fragment(run_every=TRANSCRIBE_POLL_SECONDS)
+def show_transcription():
+    """
+    Progress of the current voice job, re-polled on its own every
+    TRANSCRIBE_POLL_SECONDS; once the transcript is ready the whole page
+    reruns so the text area picks it up.
+    """
+    job = st.session_state.voice_job
+    if job is None:
+        return
+    if not job.done.is_set():
+        st.info(f"⏳ Transcribing... {job.text}")
+    elif job.error:
+        st.error(f"Audio transcription failed: {job.error}")
+        if st.button("🔁 Retry transcription"):
+            transcriber().forget(job.digest)
+            st.session_state.voice_job = None
+            st.rerun()
+    elif st.session_state.voice_job_applied != job.digest:
+        st.session_state.voice_text = job.text
+        st.session_state.voice_job_applied = job.digest
+        st.rerun()
+    elif job.text:
+        st.success(f"Transcribed: {job.text}")
 
 defaults = {
     "token": None,
     "username": None,
     "voice_text": "",
-    "history_cache": load_history(),
+    "voice_job": None,
+    "voice_job_applied": None,
+    "history_cache": [],
+    "history_offset": 0,
+    "history_columns": None,
+    "history_stats": None,
     "show_register": False
 }
 for key, val in defaults.items():
     if key not in st.session_state:
         st.session_state[key] = val
+load_history()
 
 if not st.session_state.token:
     st.markdown(f"<div class='big-title'>{APP_TITLE}</div>", unsafe_allow_html=True)
@@ -289,18 +324,15 @@ with tab_predict:
                             with sr.Microphone() as src:
                                 st.info("🎤 Listening... Speak now.")
                                 audio = r.listen(src, timeout=10)
-                            text = r.recognize_google(audio)
-                            st.session_state.voice_text = text
-                            st.success(f"Transcribed: {text}")
+                            st.session_state.voice_job = transcriber().submit_audio(audio)
                         except Exception as e:
                             st.error(f"Error: {e}")
                 with colv2:
                     uploaded = st.file_uploader("Upload Audio (WAV/MP3)", type=["wav", "mp3"])
                     if uploaded:
-                        text = transcribe_audio(uploaded)
-                        if text:
-                            st.session_state.voice_text = text
-                            st.success(f"Transcribed: {text}")
+                        # Reruns re-submit the same bytes, which hits the transcript cache
+                        st.session_state.voice_job = transcribe_audio(uploaded)
+                show_transcription()
             symptoms = st.text_area("Edit recognized text", value=st.session_state.voice_text, height=100)
         severity = st.slider("Severity (0–10)", 0, 10, 5)
         duration = st.number_input("Duration (days)", 0, 365, 1)
@@ -379,8 +411,8 @@ with tab_predict:
                         "Medications": ", ".join(meds) if meds else "None",
                         "Suggested Doctors": ", ".join([next((spec for key, spec in doctor_suggestions.items() if key in d.lower()), "General Physician") for d, _ in diseases])
                     }
-                    st.session_state.history_cache.append(entry)
                     save_history_entry(entry)
+                    load_history()
                     st.success("📜 Prediction saved to history successfully!")
                 else:
                     st.error(f"Server Error: {resp.text}")
@@ -400,41 +432,23 @@ with tab_dashboard:
     if not st.session_state.history_cache:
         st.info("No data available yet.")
     else:
-        df = pd.DataFrame(st.session_state.history_cache).fillna("Unknown")
-        total_predictions = len(df)
-        disease_str = ",".join(df.get("Predicted Diseases", "Unknown").astype(str))
-        disease_list = [d.strip() for d in disease_str.split(",") if d.strip() and d.lower() != "none"]
-        unique_diseases = len(set(disease_list))
-        doc_str = ",".join(df.get("Suggested Doctors", "Unknown").astype(str))
-        doc_list = [d.strip() for d in doc_str.split(",") if d.strip() and d.lower() != "none"]
-        med_str = ",".join(df.get("Medications", "Unknown").astype(str))
-        med_list = [m.strip() for m in med_str.split(",") if m.strip() and m.lower() != "none"]
+        stats = st.session_state.history_stats
+        frames = dashboard_frames(st.session_state.history_offset, stats)
+        disease_counts = frames["Predicted Diseases"]
+        doctor_counts = frames["Suggested Doctors"]
+        med_counts = frames["Medications"]
         col1, col2, col3, col4 = st.columns(4)
-        col1.metric("🧾 Total Predictions", total_predictions)
-        col2.metric("🧬 Unique Diseases", unique_diseases)
-        col3.metric("💊 Unique Medications", len(set(med_list)))
-        col4.metric("🏥 Unique Doctors", len(set(doc_list)))
-        if disease_list:
-            disease_counts = pd.Series(disease_list).value_counts().reset_index()
-            disease_counts.columns = ["Disease", "Count"]
-            most_common_disease = disease_counts.iloc[0]["Disease"]
-        else:
-            disease_counts = pd.DataFrame(columns=["Disease", "Count"])
-            most_common_disease = "No data"
-        if doc_list:
-            doctor_counts = pd.Series(doc_list).value_counts().reset_index()
-            doctor_counts.columns = ["Doctor", "Count"]
-            most_common_doctor = doctor_counts.iloc[0]["Doctor"]
-        else:
-            doctor_counts = pd.DataFrame(columns=["Doctor", "Count"])
-            most_common_doctor = "No data"
+        col1.metric("🧾 Total Predictions", stats.total)
+        col2.metric("🧬 Unique Diseases", len(disease_counts))
+        col3.metric("💊 Unique Medications", len(med_counts))
+        col4.metric("🏥 Unique Doctors", len(doctor_counts))
+        most_common_disease = disease_counts.iloc[0]["Disease"] if not disease_counts.empty else "No data"
+        most_common_doctor = doctor_counts.iloc[0]["Doctor"] if not doctor_counts.empty else "No data"
         st.markdown(f"### 🦠 Most Common Disease: **{most_common_disease}**")
         st.markdown(f"### 🧑‍⚕️ Most Suggested Doctor: **{most_common_doctor}**")
         if not disease_counts.empty:
             st.plotly_chart(px.bar(disease_counts, x="Disease", y="Count", title="🧬 Disease Frequency"), use_container_width=True)
-        if med_list:
-            med_counts = pd.Series(med_list).value_counts().reset_index()
-            med_counts.columns = ["Medication", "Count"]
+        if not med_counts.empty:
             st.plotly_chart(px.pie(med_counts, values="Count", names="Medication", title="💊 Medication Distribution"), use_container_width=True)
         if not doctor_counts.empty:
             st.plotly_chart(px.bar(doctor_counts, x="Doctor", y="Count", title="🏥 Doctor Recommendation Frequency"), use_container_width=True)